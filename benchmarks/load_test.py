@@ -0,0 +1,302 @@
+"""Teste de carga dos routers de usuários, eventos, reservas e comentários e do broadcast via websocket.
+
+Uso: python -m benchmarks.load_test [--duration 30] [--concurrency 50] [--save-baseline]
+
+Por padrão a app roda no mesmo processo (httpx.ASGITransport), usando o
+Postgres e o Redis configurados no .env. Com --url os requests HTTP vão para
+um servidor já rodando, e o broadcast via websocket não é medido.
+
+Antes da carga a base é populada pelos endpoints de lote: usuários, eventos e
+milhares de reservas e comentários. Cada endpoint é reportado com RPS e
+p50/p95/p99. Os resultados são comparados com o baseline salvo, e o script
+sai com código 1 se algum endpoint piorou além da tolerância.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+
+from benchmarks.password_hashing import percentile
+
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "load_test.json"
+BATCH_SIZE = 1000
+PASSWORD = "benchmark123"
+
+
+class Dataset:
+    def __init__(self):
+        self.users: list[dict] = []
+        self.events: list[int] = []
+        self.reservations: list[int] = []
+        self.comments: list[int] = []
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def observe(self, name: str, seconds: float, ok: bool = True) -> None:
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def report(self, duration: float) -> dict[str, dict]:
+        return {
+            name: {
+                "count": len(samples),
+                "errors": self.errors[name],
+                "rps": len(samples) / duration,
+                "p50_ms": percentile(samples, 50) * 1000,
+                "p95_ms": percentile(samples, 95) * 1000,
+                "p99_ms": percentile(samples, 99) * 1000,
+            }
+            for name, samples in sorted(self.latencies.items())
+        }
+
+
+class ASGIWebSocket:
+    """Cliente websocket mínimo que fala o protocolo ASGI direto com a app."""
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path = path
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.outgoing: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": self.path,
+            "raw_path": self.path.encode(), "root_path": "", "query_string": b"", "headers": [],
+            "subprotocols": [], "client": ("bench", 0), "server": ("bench", 80),
+        }
+        self.task = asyncio.create_task(self.app(scope, self.incoming.get, self.outgoing.put))
+        await self.incoming.put({"type": "websocket.connect"})
+        message = await self.outgoing.get()
+        if message["type"] != "websocket.accept":
+            raise RuntimeError(f"Websocket {self.path} recusado: {message}")
+
+    async def receive_text(self) -> str:
+        message = await self.outgoing.get()
+        if message["type"] == "websocket.close":
+            raise ConnectionError(f"Websocket {self.path} fechado pela app")
+        return message["text"]
+
+    async def close(self) -> None:
+        await self.incoming.put({"type": "websocket.disconnect", "code": 1000})
+        await self.task
+
+
+def chunks(items: list, size: int = BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def post_batch(client: httpx.AsyncClient, path: str, rows: list[dict]) -> list[int]:
+    ids = []
+    for chunk in chunks(rows):
+        response = await client.post(path, json=chunk)
+        response.raise_for_status()
+        ids.extend(result["id"] for result in response.json()["results"] if result["id"] is not None)
+    return ids
+
+
+async def seed(client: httpx.AsyncClient, rng: random.Random, args) -> Dataset:
+    dataset = Dataset()
+    run_id = uuid.uuid4().hex[:8]
+
+    for index in range(args.users):
+        username = f"bench{run_id}{index}"
+        response = await client.post("/users/", json={"username": username, "email": f"{username}@bench.com", "password": PASSWORD})
+        response.raise_for_status()
+        dataset.users.append({"id": response.json()["id"], "username": username})
+
+    now = datetime.now()
+    dataset.events = await post_batch(client, "/events/batch", [
+        {
+            "name": f"Evento {run_id} {index}",
+            "date": (now + timedelta(days=rng.randint(1, 365))).isoformat(),
+            "location": rng.choice(["São Carlos", "São Paulo", "Campinas", "Araraquara"]),
+            "capacity": int(10 * (args.reservations_per_event + args.duration * args.concurrency)),
+            "user_id": rng.choice(dataset.users)["id"],
+            "content": {"text": f"Descrição do evento {index}", "tags": rng.sample(["música", "comida", "arte", "tech"], 2)},
+        }
+        for index in range(args.events)
+    ])
+    dataset.reservations = await post_batch(client, "/reservations/batch", [
+        {"num_guests": rng.randint(1, 4), "user_id": rng.choice(dataset.users)["id"], "event_id": event_id}
+        for event_id in dataset.events for _ in range(args.reservations_per_event)
+    ])
+    dataset.comments = await post_batch(client, "/comments/batch", [
+        comment_payload(rng, dataset, event_id)
+        for event_id in dataset.events for _ in range(args.comments_per_event)
+    ])
+    return dataset
+
+
+def comment_payload(rng: random.Random, dataset: Dataset, event_id: Optional[int] = None) -> dict:
+    return {
+        "content": {"title": "Comentário", "text": "Gostei bastante do evento", "raiting": rng.randint(1, 10)},
+        "user_id": rng.choice(dataset.users)["id"],
+        "event_id": event_id or rng.choice(dataset.events),
+    }
+
+
+# (nome reportado, peso, função que monta o request)
+Scenario = tuple[str, int, Callable[[random.Random, Dataset], tuple[str, str, Optional[dict]]]]
+
+SCENARIOS: list[Scenario] = [
+    ("GET /users/", 5, lambda rng, d: ("GET", "/users/", None)),
+    ("GET /users/{user_id}", 10, lambda rng, d: ("GET", f"/users/{rng.choice(d.users)['id']}", None)),
+    ("GET /users/{user_id}/events", 5, lambda rng, d: ("GET", f"/users/{rng.choice(d.users)['id']}/events", None)),
+    ("POST /users/login", 1, lambda rng, d: ("POST", "/users/login", {"username": rng.choice(d.users)["username"], "password": PASSWORD})),
+    ("GET /events/", 15, lambda rng, d: ("GET", "/events/", None)),
+    ("GET /events/{event_id}", 20, lambda rng, d: ("GET", f"/events/{rng.choice(d.events)}", None)),
+    ("PATCH /events/{event_id}", 2, lambda rng, d: ("PATCH", f"/events/{rng.choice(d.events)}", {"content": {"text": "Atualizado"}})),
+    ("GET /reservations/", 5, lambda rng, d: ("GET", "/reservations/", None)),
+    ("GET /reservations/{reservation_id}", 10, lambda rng, d: ("GET", f"/reservations/{rng.choice(d.reservations)}", None)),
+    ("POST /reservations/", 5, lambda rng, d: ("POST", "/reservations/", {"num_guests": 1, "user_id": rng.choice(d.users)["id"], "event_id": rng.choice(d.events)})),
+    ("GET /comments/", 5, lambda rng, d: ("GET", "/comments/", None)),
+    ("GET /comments/{comment_id}", 10, lambda rng, d: ("GET", f"/comments/{rng.choice(d.comments)}", None)),
+    ("POST /comments/", 3, lambda rng, d: ("POST", "/comments/", comment_payload(rng, d))),
+]
+
+
+async def http_worker(client: httpx.AsyncClient, rng: random.Random, dataset: Dataset, recorder: Recorder, deadline: float) -> None:
+    weights = [weight for _, weight, _ in SCENARIOS]
+    while time.perf_counter() < deadline:
+        name, _, build = rng.choices(SCENARIOS, weights)[0]
+        method, path, body = build(rng, dataset)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        recorder.observe(name, time.perf_counter() - start, ok)
+
+
+async def websocket_load(app, client: httpx.AsyncClient, recorder: Recorder, deadline: float, connections: int, interval: float) -> None:
+    """Conecta clientes em /ws e mede o tempo entre publicar a mensagem e cada cliente recebê-la."""
+    sockets = [ASGIWebSocket(app, "/ws") for _ in range(connections)]
+    await asyncio.gather(*(socket.connect() for socket in sockets))
+
+    async def reader(socket: ASGIWebSocket):
+        while True:
+            message = json.loads(await socket.receive_text())
+            recorder.observe("WS broadcast", time.perf_counter() - message["sent_at"])
+
+    readers = [asyncio.create_task(reader(socket)) for socket in sockets]
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.post("/send_message_to_all_websocket_users", json={"sent_at": start})
+            recorder.observe("POST /send_message_to_all_websocket_users", time.perf_counter() - start, response.status_code < 400)
+            await asyncio.sleep(interval)
+        await asyncio.sleep(1)
+    finally:
+        for task in readers:
+            task.cancel()
+        await asyncio.gather(*(socket.close() for socket in sockets), return_exceptions=True)
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.1f}ms -> {current['p95_ms']:.1f}ms")
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: RPS {previous['rps']:.1f} -> {current['rps']:.1f}")
+    return regressions
+
+
+def print_report(results: dict[str, dict]) -> None:
+    print(f"{'endpoint':<45} {'reqs':>7} {'erros':>6} {'RPS':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name, row in results.items():
+        print(
+            f"{name:<45} {row['count']:>7} {row['errors']:>6} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>6.1f}ms {row['p95_ms']:>6.1f}ms {row['p99_ms']:>6.1f}ms"
+        )
+
+
+async def main(args) -> int:
+    rng = random.Random(args.seed)
+    app = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+    else:
+        from src.main import app
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+
+    try:
+        dataset = await seed(client, rng, args)
+        print(
+            f"Base populada: {len(dataset.users)} usuários, {len(dataset.events)} eventos, "
+            f"{len(dataset.reservations)} reservas, {len(dataset.comments)} comentários"
+        )
+
+        recorder = Recorder()
+        start = time.perf_counter()
+        deadline = start + args.duration
+        tasks = [
+            http_worker(client, random.Random(rng.random()), dataset, recorder, deadline)
+            for _ in range(args.concurrency)
+        ]
+        if app is not None and args.ws_connections:
+            tasks.append(websocket_load(app, client, recorder, deadline, args.ws_connections, args.ws_interval))
+        await asyncio.gather(*tasks)
+        results = recorder.report(time.perf_counter() - start)
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+
+    print_report(results)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        print(f"Baseline salvo em {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("Nenhum baseline encontrado, rode com --save-baseline para criar um.")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSÃO {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="servidor já rodando; sem ele a app roda no mesmo processo")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--reservations-per-event", type=int, default=1000)
+    parser.add_argument("--comments-per-event", type=int, default=200)
+    parser.add_argument("--ws-connections", type=int, default=100)
+    parser.add_argument("--ws-interval", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="piora relativa aceita no p95 e no RPS")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main(args)))
@@ -0,0 +1,85 @@
+"""Latência de um endpoint não relacionado enquanto logins calculam bcrypt.
+
+Uso: python -m benchmarks.password_hashing [--logins 50] [--concurrency 10]
+
+Sobe uma app mínima com /login (verifica um hash bcrypt) e /ping, dispara
+logins concorrentes e mede o p50/p99 de /ping em dois modos: bcrypt síncrono
+dentro do endpoint (como era antes) e via src.passwords no executor.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from src.passwords import pwd_context, verify_password
+
+
+PASSWORD = "felipe123"
+
+
+def build_app(hashed_password: str, blocking: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if blocking:
+            return {"ok": pwd_context.verify(PASSWORD, hashed_password)}
+        return {"ok": await verify_password(PASSWORD, hashed_password)}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def percentile(samples: list[float], q: float) -> float:
+    return statistics.quantiles(samples, n=100)[int(q) - 1] if len(samples) > 1 else samples[0]
+
+
+async def run(app: FastAPI, logins: int, concurrency: int) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+        latencies = []
+
+        async def login():
+            async with semaphore:
+                await client.post("/login")
+
+        async def probe():
+            # Mede a partir do horário agendado, não do envio, para contar o tempo em que o loop ficou travado.
+            scheduled = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(max(0, scheduled - time.perf_counter()))
+                await client.get("/ping")
+                latencies.append(time.perf_counter() - scheduled)
+                scheduled += 0.005
+
+        probe_task = asyncio.create_task(probe())
+        await asyncio.gather(*(login() for _ in range(logins)))
+        done.set()
+        await probe_task
+        return latencies
+
+
+async def main(logins: int, concurrency: int) -> None:
+    hashed_password = pwd_context.hash(PASSWORD)
+    for name, blocking in [("sync", True), ("executor", False)]:
+        latencies = await run(build_app(hashed_password, blocking), logins, concurrency)
+        print(
+            f"{name:>8}: {len(latencies)} pings "
+            f"p50={percentile(latencies, 50) * 1000:.1f}ms p99={percentile(latencies, 99) * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
@@ -0,0 +1,126 @@
+"""Custo de serializar uma página grande em cada rota de listagem.
+
+Uso: python -m benchmarks.serialization [--rows 5000] [--repeat 20]
+
+Para cada schema das listas (/users/, /events/, /events/search, /reservations/
+e /comments/) monta uma app mínima com três rotas que devolvem a mesma página
+já carregada, sem banco:
+
+- orm: objetos do ORM validados pelo response_model do FastAPI (caminho padrão);
+- validate: tuplas validadas em lote por um TypeAdapter (FAST_SERIALIZATION=validate);
+- trusted: tuplas codificadas pelo orjson sem validação (FAST_SERIALIZATION=trusted).
+
+Mostra a mediana do tempo por request e confere que as três respostas são iguais.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi import FastAPI
+
+import src.main  # noqa: F401 registra todos os modelos
+from src.comments.models import Comment
+from src.comments.schemas import CommentResponse
+from src.events.models import Event
+from src.events.schemas import EventResponse
+from src.pagination import Page
+from src.reservations.models import Reservation
+from src.reservations.schemas import ReservationResponse
+from src.serialization import RawJSONResponse, dump_json
+from src.users.models import User
+from src.users.schemas import UserResponse
+
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def user_row(i: int) -> dict:
+    return {"id": i, "username": f"usuario{i}", "email": f"usuario{i}@eventone.com", "is_admin": False, "created_at": NOW}
+
+
+def event_row(i: int) -> dict:
+    return {
+        "id": i, "name": f"Festival da batata {i}", "date": NOW + timedelta(days=i % 365), "location": "São Carlos",
+        "capacity": 100, "reserved_seats": i % 100, "flash_sale": False, "user_id": 1 + i % 50,
+        "content": {"text": "Descrição do evento", "tags": ["comida", "música"]}, "created_at": NOW,
+    }
+
+
+def reservation_row(i: int) -> dict:
+    return {"id": i, "num_guests": 1 + i % 4, "user_id": 1 + i % 50, "event_id": 1 + i % 200, "created_at": NOW}
+
+
+def comment_row(i: int) -> dict:
+    return {
+        "id": i, "content": {"title": "Comentário", "text": "Gostei bastante do evento", "raiting": 1 + i % 10},
+        "user_id": 1 + i % 50, "event_id": 1 + i % 200, "created_at": NOW,
+    }
+
+
+ROUTES = [
+    ("GET /users/", User, UserResponse, user_row),
+    ("GET /events/", Event, EventResponse, event_row),
+    ("GET /events/search", Event, EventResponse, event_row),
+    ("GET /reservations/", Reservation, ReservationResponse, reservation_row),
+    ("GET /comments/", Comment, CommentResponse, comment_row),
+]
+
+
+def build_app(model, schema, make_row, rows: int) -> FastAPI:
+    app = FastAPI()
+    names = list(schema.model_fields)
+    data = [make_row(i) for i in range(1, rows + 1)]
+    objects = [model(**{name: row[name] for name in model.__table__.columns.keys() if name in row}) for row in data]
+    tuples = [tuple(row[name] for name in names) for row in data]
+
+    @app.get("/orm", response_model=Page[schema])
+    async def orm():
+        return {"items": objects, "next_cursor": None}
+
+    @app.get("/validate")
+    async def validate():
+        page = {"items": [dict(zip(names, row)) for row in tuples], "next_cursor": None}
+        return RawJSONResponse(dump_json(page, Page[schema]))
+
+    @app.get("/trusted")
+    async def trusted():
+        page = {"items": [dict(zip(names, row)) for row in tuples], "next_cursor": None}
+        return RawJSONResponse(dump_json(page))
+
+    return app
+
+
+async def measure(app: FastAPI, repeat: int) -> tuple[dict[str, float], bool]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        timings, bodies = {}, {}
+        for mode in ["orm", "validate", "trusted"]:
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                response = await client.get(f"/{mode}")
+                samples.append(time.perf_counter() - start)
+            timings[mode] = statistics.median(samples)
+            bodies[mode] = response.json()
+    return timings, bodies["orm"] == bodies["validate"] == bodies["trusted"]
+
+
+async def main(rows: int, repeat: int) -> None:
+    print(f"{'rota':<22} {'orm':>9} {'validate':>9} {'trusted':>9} {'ganho':>7}  iguais")
+    for name, model, schema, make_row in ROUTES:
+        timings, same = await measure(build_app(model, schema, make_row, rows), repeat)
+        print(
+            f"{name:<22} {timings['orm'] * 1000:>7.1f}ms {timings['validate'] * 1000:>7.1f}ms "
+            f"{timings['trusted'] * 1000:>7.1f}ms {timings['orm'] / timings['trusted']:>6.1f}x  {'sim' if same else 'NÃO'}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,38 @@
+"""add events reserved_seats
+
+Revision ID: 8a4d6e2b1c93
+Revises: 3c7e1a9d2f40
+Create Date: 2026-10-18 10:41:05.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4d6e2b1c93'
+down_revision: Union[str, None] = '3c7e1a9d2f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('reserved_seats', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE events
+        SET reserved_seats = totals.num_guests
+        FROM (
+            SELECT event_id, SUM(num_guests) AS num_guests
+            FROM reservations
+            GROUP BY event_id
+        ) AS totals
+        WHERE events.id = totals.event_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('events', 'reserved_seats')
@@ -0,0 +1,50 @@
+"""add event ratings
+
+Revision ID: e6d1a4c8f375
+Revises: c3b8f5d2a614
+Create Date: 2026-10-18 17:52:36.480917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6d1a4c8f375'
+down_revision: Union[str, None] = 'c3b8f5d2a614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('event_ratings',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.SmallInteger(), nullable=False),
+    sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'rating')
+    )
+    op.execute(
+        """
+        INSERT INTO event_ratings (event_id, rating, count)
+        SELECT event_id, rating, COUNT(*)
+        FROM (
+            SELECT event_id,
+                   CASE WHEN jsonb_typeof(content -> 'raiting') = 'number'
+                        THEN CASE WHEN (content ->> 'raiting')::numeric BETWEEN 1 AND 10
+                                   AND (content ->> 'raiting')::numeric % 1 = 0
+                                  THEN (content ->> 'raiting')::numeric::integer
+                             END
+                   END AS rating
+            FROM comments
+        ) AS ratings
+        WHERE rating IS NOT NULL
+        GROUP BY event_id, rating
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('event_ratings')
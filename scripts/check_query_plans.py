@@ -0,0 +1,90 @@
+"""Roda EXPLAIN nas queries mais usadas pelos routers e falha se alguma fizer Seq Scan.
+
+Uso: python -m scripts.check_query_plans
+
+O seq scan é desligado na sessão (enable_seqscan = off) para que o planner
+só escolha Seq Scan quando nenhum índice atende a query, independente do
+tamanho das tabelas no banco local.
+"""
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Select, func, literal_column, select, text, update
+from sqlalchemy.dialects import postgresql
+
+from src.database import engine
+from src.pagination import PageParams, encode_cursor, keyset, ranked
+from src.events.models import Event, SEARCH_CONFIG
+from src.users.models import User
+from src.comments.models import Comment
+from src.reservations.models import Reservation
+
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+CURSOR = encode_cursor(NOW, 1000)
+TS_QUERY = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), "festival batata")
+
+HOT_QUERIES: dict[str, Select] = {
+    "events_page": keyset(select(Event), Event, PageParams(cursor=CURSOR, limit=50)),
+    "comments_page": keyset(select(Comment), Comment, PageParams(cursor=CURSOR, limit=50)),
+    "reservations_page": keyset(select(Reservation), Reservation, PageParams(cursor=CURSOR, limit=50)),
+    "users_page": keyset(select(User.id), User, PageParams(cursor=CURSOR, limit=50)),
+    "event_by_id": select(Event).where(Event.id == 1),
+    "events_by_user": select(Event).where(Event.user_id == 1),
+    "events_by_date": select(Event).where(Event.date.between(NOW, NOW + timedelta(days=30))),
+    "events_search": ranked(
+        select(Event).where(Event.search_vector.bool_op("@@")(TS_QUERY)),
+        func.ts_rank(Event.search_vector, TS_QUERY), Event, PageParams(cursor=None, limit=50),
+    ),
+    "events_by_location": select(Event).where(Event.location == "São Carlos", Event.date >= NOW),
+    "events_available_by_date": select(Event).where(Event.date >= NOW, Event.reserved_seats < Event.capacity),
+    "events_by_content": select(Event).where(Event.content.contains(text("""'{"category": "show"}'::jsonb"""))),
+    "comments_by_event": select(Comment).where(Comment.event_id == 1),
+    "comments_page_by_event": keyset(select(Comment).where(Comment.event_id == 1), Comment, PageParams(cursor=CURSOR, limit=50)),
+    "comments_by_user": select(Comment).where(Comment.user_id == 1),
+    "comments_by_content": select(Comment).where(Comment.content.contains(text("""'{"raiting": 10}'::jsonb"""))),
+    "reservations_by_event": select(Reservation).where(Reservation.event_id == 1),
+    "reservations_page_by_event": keyset(select(Reservation).where(Reservation.event_id == 1), Reservation, PageParams(cursor=CURSOR, limit=50)),
+    "reservations_by_user": select(Reservation).where(Reservation.user_id == 1),
+    "user_by_username": select(User.id).where(User.username == "Felipe"),
+    "reserve_seats": (
+        update(Event)
+        .where(Event.id == 1, Event.reserved_seats + 1 <= Event.capacity)
+        .values(reserved_seats=Event.reserved_seats + 1)
+    ),
+}
+
+
+def seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def check_query_plans() -> dict[str, list[str]]:
+    failures = {}
+    async with engine.connect() as conn:
+        await conn.execute(text("SET enable_seqscan = off"))
+        for name, query in HOT_QUERIES.items():
+            sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+            query_result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+            plan = query_result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            tables = seq_scans(plan[0]["Plan"])
+            if tables:
+                failures[name] = tables
+    await engine.dispose()
+    return failures
+
+
+if __name__ == "__main__":
+    failures = asyncio.run(check_query_plans())
+    for name, tables in failures.items():
+        print(f"{name}: Seq Scan em {', '.join(tables)}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,68 @@
+"""Mostra para qual instância do Postgres cada tipo de sessão é roteada.
+
+Uso: DB_REPLICA_HOSTS='["localhost:5433"]' python -m scripts.check_replicas
+
+Com duas instâncias locais (o primário em DB_PORT e a réplica na porta
+configurada), imprime a porta do servidor que respondeu às escritas, às
+leituras e às leituras de um cliente que acabou de escrever, e sai com
+código 1 se alguma foi parar na instância errada.
+"""
+import asyncio
+import sys
+import time
+
+from sqlalchemy import text
+from starlette.requests import Request
+
+from src.config import settings as s
+from src.database import PRIMARY_COOKIE, async_session_maker, get_read_session, replica_engines
+
+
+def request(cookie: str = "") -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+async def server_port(session) -> int:
+    query_result = await session.execute(text("SELECT current_setting('port')::int"))
+    return query_result.scalar_one()
+
+
+async def read_port(req: Request) -> int:
+    sessions = get_read_session(req)
+    session = await sessions.__anext__()
+    try:
+        return await server_port(session)
+    finally:
+        await sessions.aclose()
+
+
+async def check_replicas() -> list[str]:
+    if not replica_engines:
+        return ["Nenhuma réplica configurada em DB_REPLICA_HOSTS"]
+
+    async with async_session_maker() as session:
+        primary = await server_port(session)
+    replicas = {engine.url.port for engine in replica_engines}
+    reads = [await read_port(request()) for _ in range(2 * len(replica_engines))]
+    pinned = await read_port(request(f"{PRIMARY_COOKIE}={time.time() + 60}"))
+
+    print(f"escritas: {primary}")
+    print(f"leituras ({s.db_replica_strategy}): {reads}")
+    print(f"leituras logo após uma escrita: {pinned}")
+
+    errors = []
+    if primary in replicas:
+        errors.append("o primário e a réplica são a mesma instância")
+    if any(port not in replicas for port in reads):
+        errors.append("leituras foram para o primário")
+    if pinned != primary:
+        errors.append("a leitura após a escrita não foi para o primário")
+    return errors
+
+
+if __name__ == "__main__":
+    errors = asyncio.run(check_replicas())
+    for error in errors:
+        print(error)
+    sys.exit(1 if errors else 0)
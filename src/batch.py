@@ -0,0 +1,36 @@
+from typing import Iterable
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings as s
+from src.schemas import BatchItemResult
+
+
+def check_batch_size(payload: list) -> None:
+    if not payload:
+        raise HTTPException(status_code=400, detail="Lote vazio")
+    if len(payload) > s.batch_max_size:
+        raise HTTPException(status_code=400, detail=f"Lote maior que {s.batch_max_size} itens")
+
+
+async def existing_ids(session: AsyncSession, column, ids: Iterable[int]) -> set[int]:
+    query_result = await session.scalars(select(column).where(column.in_(set(ids))))
+    return set(query_result.all())
+
+
+async def insert_many(session: AsyncSession, model, rows: list[dict]) -> list[int]:
+    """Insere as linhas em um único INSERT de várias linhas e retorna os ids na mesma ordem."""
+    if not rows:
+        return []
+    query = insert(model).returning(model.id, sort_by_parameter_order=True)
+    query_result = await session.execute(query, rows)
+    return list(query_result.scalars().all())
+
+
+def batch_response(failures: dict[int, BatchItemResult], indexes: list[int], ids: list[int]) -> dict:
+    results = dict(failures)
+    for index, id in zip(indexes, ids):
+        results[index] = BatchItemResult(index=index, status_code=201, id=id)
+    return {"results": [results[index] for index in sorted(results)]}
@@ -0,0 +1,205 @@
+"""Cache de respostas com invalidação por tags sobre o fastapi-cache.
+
+Cada rota cacheada declara as tags das suas respostas (ex.: "event:{event_id}").
+A chave gerada é registrada no conjunto de cada tag quando a resposta é gravada,
+e as escritas apagam todas as chaves das tags que afetam.
+
+As respostas saem com Cache-Control: no-cache e um ETag do corpo cacheado:
+browsers e proxies revalidam a cada uso (304 se nada mudou) em vez de guardar
+a resposta pelo TTL do Redis, que só a invalidação por tags consegue encurtar.
+"""
+import functools
+import hashlib
+import inspect as pyinspect
+import json
+import logging
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.coder import JsonCoder, JsonEncoder, object_hook
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from src.database import Base
+from src.events.models import Event
+from src.events.upcoming import refresh_upcoming
+from src.redis_client import redis
+from src.serialization import RawJSONResponse
+
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "fastapi-cache"
+
+_tags: ContextVar[Tuple[str, ...]] = ContextVar("cache_tags", default=())
+
+INVALIDATE_SCRIPT = redis.register_script("""
+for _, tag in ipairs(KEYS) do
+    local keys = redis.call('SMEMBERS', tag)
+    for _, key in ipairs(keys) do
+        redis.call('DEL', key)
+    end
+    redis.call('DEL', tag)
+end
+return #KEYS
+""")
+
+
+def tag_key(tag: str) -> str:
+    return f"{PREFIX}:tag:{tag}"
+
+
+def orm_to_dict(obj: Base) -> dict:
+    state = inspect(obj)
+    return {attr.key: state.dict[attr.key] for attr in state.mapper.column_attrs if attr.key in state.dict}
+
+
+class CacheEncoder(JsonEncoder):
+    def default(self, obj: Any) -> Any:
+        if isinstance(obj, Base):
+            return jsonable_encoder(orm_to_dict(obj))
+        return super().default(obj)
+
+
+class CacheCoder(JsonCoder):
+    """JsonCoder que aceita objetos do ORM e preserva respostas JSONResponse prontas."""
+
+    @classmethod
+    def encode(cls, value: Any) -> str:
+        if isinstance(value, JSONResponse):
+            return json.dumps({"_response": value.body.decode()})
+        return json.dumps(value, cls=CacheEncoder)
+
+    @classmethod
+    def decode(cls, value: str) -> Any:
+        result = json.loads(value, object_hook=object_hook)
+        if isinstance(result, dict) and "_response" in result:
+            return RawJSONResponse(result["_response"].encode())
+        return result
+
+
+class TaggedRedisBackend(RedisBackend):
+    def __init__(self, redis):
+        super().__init__(redis)
+        self.stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[str]]:
+        ttl, value = await super().get_with_ttl(key)
+        namespace = key.split(":")[1]
+        self.stats[namespace]["hits" if value is not None else "misses"] += 1
+        return ttl, value
+
+    async def set(self, key: str, value: str, expire: Optional[int] = None) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(key, value, ex=expire)
+            for tag in _tags.get():
+                pipe.sadd(tag_key(tag), key)
+                if expire:
+                    pipe.expire(tag_key(tag), expire)
+            await pipe.execute()
+
+    def hit_ratio(self) -> dict[str, dict]:
+        return {
+            namespace: {**counts, "ratio": counts["hits"] / ((counts["hits"] + counts["misses"]) or 1)}
+            for namespace, counts in self.stats.items()
+        }
+
+
+backend = TaggedRedisBackend(redis)
+
+
+def tagged(*tags: str) -> Callable[..., str]:
+    """key_builder que usa o path e a query string como chave e registra as tags da rota.
+
+    As tags podem usar os path params da rota, ex.: tagged("event:{event_id}").
+    """
+    def key_builder(func, namespace: str = "", request: Request = None, response=None, args=None, kwargs=None) -> str:
+        _tags.set(tuple(tag.format(**request.path_params) for tag in tags))
+        query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+        return f"{FastAPICache.get_prefix()}:{namespace}:{request.url.path}?{query}"
+    return key_builder
+
+
+def etag_of(value) -> str:
+    """ETag do valor gravado no cache, igual no miss e no hit e em todos os workers."""
+    if isinstance(value, str):
+        value = value.encode()
+    return f'W/"{hashlib.sha1(value).hexdigest()}"'
+
+
+def cache(expire: Optional[int] = None, namespace: str = "", key_builder: Optional[Callable[..., str]] = None):
+    """Mesmo uso do @cache do fastapi-cache, com os cabeçalhos HTTP descritos no topo do módulo."""
+    def decorator(func):
+        signature = pyinspect.signature(func)
+        parameters = [
+            *signature.parameters.values(),
+            pyinspect.Parameter("_cache_request", pyinspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            pyinspect.Parameter("_cache_response", pyinspect.Parameter.KEYWORD_ONLY, annotation=Response),
+        ]
+
+        @functools.wraps(func)
+        async def inner(*args, _cache_request: Request, _cache_response: Response, **kwargs):
+            request = _cache_request
+            if request.headers.get("Cache-Control") in ("no-store", "no-cache") or not FastAPICache.get_enable():
+                return await func(*args, **kwargs)
+
+            coder, backend = FastAPICache.get_coder(), FastAPICache.get_backend()
+            cache_key = (key_builder or FastAPICache.get_key_builder())(func, namespace, request=request, kwargs=kwargs)
+            try:
+                _, value = await backend.get_with_ttl(cache_key)
+            except Exception:
+                logger.warning("Falha ao ler a chave %s do cache", cache_key, exc_info=True)
+                value = None
+
+            if value is None:
+                result = await func(*args, **kwargs)
+                value = coder.encode(result)
+                try:
+                    await backend.set(cache_key, value, expire or FastAPICache.get_expire())
+                except Exception:
+                    logger.warning("Falha ao gravar a chave %s no cache", cache_key, exc_info=True)
+            else:
+                result = coder.decode(value)
+
+            headers = {"Cache-Control": "no-cache", "ETag": etag_of(value)}
+            if request.headers.get("if-none-match") == headers["ETag"]:
+                return Response(status_code=304, headers=headers)
+            (result if isinstance(result, Response) else _cache_response).headers.update(headers)
+            return result
+
+        inner.__signature__ = signature.replace(parameters=parameters)
+        return inner
+    return decorator
+
+
+async def invalidate(*tags: str) -> None:
+    if not tags:
+        return
+    try:
+        await INVALIDATE_SCRIPT(keys=[tag_key(tag) for tag in set(tags)])
+    except Exception:
+        logger.exception("Falha ao invalidar as tags %s", tags)
+
+
+def event_tags(event_id: int, user_id: int) -> list[str]:
+    return [f"event:{event_id}", f"event:{event_id}:ratings", "events:list", f"user:{user_id}:events"]
+
+
+async def invalidate_events(session: AsyncSession, event_ids: Iterable[int]) -> None:
+    """Invalida as respostas dos eventos, buscando os donos para limpar as listas deles também.
+
+    Também atualiza a lista de próximos eventos, removendo os que não existem mais.
+    """
+    event_ids = set(event_ids)
+    if not event_ids:
+        return
+    query_result = await session.scalars(select(Event).where(Event.id.in_(event_ids)))
+    events = query_result.all()
+    await invalidate(*(tag for event in events for tag in event_tags(event.id, event.user_id)))
+    await refresh_upcoming(events, event_ids - {event.id for event in events})
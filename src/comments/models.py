@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, Text, ForeignKey, DateTime, func
+from sqlalchemy import Integer, Text, ForeignKey, DateTime, func, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -7,11 +7,16 @@ from src.database import Base
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_created_at_id", "created_at", "id"),
+        Index("ix_comments_content", "content", postgresql_using="gin"),
+        Index("ix_comments_event_id_created_at_id", "event_id", "created_at", "id"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE", onupdate="CASCADE"))
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"))
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE", onupdate="CASCADE"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"), index=True)
     content: Mapped[JSONB] = mapped_column(JSONB)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
-    user: Mapped["User"] = relationship(back_populates="comments")
-    event: Mapped["Event"] = relationship(back_populates="comments")
\ No newline at end of file
+    user: Mapped["User"] = relationship(back_populates="comments", lazy="raise")
+    event: Mapped["Event"] = relationship(back_populates="comments", lazy="raise")
\ No newline at end of file
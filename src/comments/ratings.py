@@ -0,0 +1,100 @@
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import Integer, Numeric, case, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.comments.models import Comment
+from src.events.models import EventRating
+
+
+RATINGS = range(1, 11)
+
+
+def rating_of(content: Optional[dict]) -> Optional[int]:
+    """Nota do comentário: um número JSON inteiro (5 ou 5.0) entre 1 e 10.
+
+    Mesma regra de rating_sql e do backfill da migração e6d1a4c8f375.
+    """
+    rating = (content or {}).get("raiting")
+    if type(rating) not in (int, float) or rating != rating or not float(rating).is_integer():
+        return None
+    if RATINGS.start <= rating < RATINGS.stop:
+        return int(rating)
+    return None
+
+
+def rating_sql(content):
+    """rating_of em SQL: NULL para tudo que não é um número inteiro entre 1 e 10.
+
+    CASE aninhado porque o Postgres não garante a ordem de avaliação do AND, e
+    o cast para numeric falharia em textos.
+    """
+    value = content["raiting"].astext.cast(Numeric)
+    whole = case((value.between(RATINGS.start, RATINGS.stop - 1) & (value % 1 == 0), value.cast(Integer)))
+    return case((func.jsonb_typeof(content["raiting"]) == "number", whole))
+
+
+def rating_delta(event_id: int, content: Optional[dict], change: int) -> Counter:
+    """Variação da quantidade de comentários por (event_id, nota)."""
+    rating = rating_of(content)
+    return Counter({(event_id, rating): change} if rating is not None else {})
+
+
+async def apply_rating_deltas(session: AsyncSession, deltas: Counter) -> None:
+    """Soma as variações nos agregados com um único upsert, na transação da escrita do comentário.
+
+    As linhas são ordenadas para que escritas concorrentes travem na mesma ordem.
+    """
+    rows = [
+        {"event_id": event_id, "rating": rating, "count": change}
+        for (event_id, rating), change in sorted(deltas.items()) if change
+    ]
+    if not rows:
+        return
+    query = insert(EventRating).values(rows)
+    query = query.on_conflict_do_update(
+        index_elements=[EventRating.event_id, EventRating.rating],
+        set_={"count": EventRating.count + query.excluded.count},
+    )
+    await session.execute(query)
+
+
+async def release_user_ratings(session: AsyncSession, user_id: int) -> list[int]:
+    """Desconta as notas dos comentários do usuário antes do cascade do banco apagá-los.
+
+    Retorna os eventos afetados.
+    """
+    rating = rating_sql(Comment.content)
+    totals = (
+        select(Comment.event_id, rating.label("rating"), func.count().label("count"))
+        .where(Comment.user_id == user_id, rating.isnot(None))
+        .group_by(Comment.event_id, rating)
+        .subquery()
+    )
+    query = (
+        update(EventRating)
+        .where(EventRating.event_id == totals.c.event_id, EventRating.rating == totals.c.rating)
+        .values(count=EventRating.count - totals.c.count)
+        .returning(EventRating.event_id)
+        .execution_options(synchronize_session=False)
+    )
+    query_result = await session.scalars(query)
+    return list(set(query_result.all()))
+
+
+async def get_ratings(session: AsyncSession, event_id: int) -> dict:
+    """Lê no máximo uma linha por nota, independente da quantidade de comentários."""
+    query = select(EventRating.rating, EventRating.count).where(EventRating.event_id == event_id, EventRating.count > 0)
+    query_result = await session.execute(query)
+    histogram = {row.rating: row.count for row in query_result.all()}
+    count = sum(histogram.values())
+    total = sum(rating * amount for rating, amount in histogram.items())
+    return {
+        "event_id": event_id,
+        "count": count,
+        "sum": total,
+        "average": total / count if count else None,
+        "histogram": dict(sorted(histogram.items())),
+    }
@@ -1,33 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from src.database import get_async_session
+from src.database import get_async_session, get_read_session
+from src.loaders import Loaders, get_primary_loaders
 from src.comments.models import Comment
+from src.events.models import Event
+from src.users.models import User
 from src.comments.schemas import CommentResponse, CommentCreate, CommentUpdate
+from src.pagination import Page, PageParams, paginate, fields_param
+from src.export import ndjson_response
+from src.batch import check_batch_size, existing_ids, insert_many, batch_response
+from src.schemas import BatchItemResult, BatchResponse
+from src.comments.ratings import rating_delta, apply_rating_deltas
+from src.cache import tagged, invalidate, cache
+from src.config import settings as s
 
 from sqlalchemy import select
+from collections import Counter
 
 router = APIRouter(
     prefix="/comments",
     tags=["Comments"]
 )
 
-@router.get("/", response_model=List[CommentResponse])
-async def get_comments(session: AsyncSession = Depends(get_async_session)):
+@router.get("/", response_model=Page[CommentResponse])
+async def get_comments(event_id: Optional[int] = Query(None), page: PageParams = Depends(), fields: Optional[List[str]] = Depends(fields_param(CommentResponse)), session: AsyncSession = Depends(get_read_session)):
     query = select(Comment)
-    query_result = await session.scalars(query)
-    result = query_result.all()
+    if event_id is not None:
+        query = query.where(Comment.event_id == event_id)
+    return await paginate(session, query, Comment, page, fields, CommentResponse)
 
-    return result
+@router.get("/export")
+async def export_comments():
+    query = select(Comment).order_by(Comment.id)
+    return ndjson_response(query, CommentResponse)
 
 @router.get("/{comment_id}", response_model=CommentResponse)
-async def get_comment(comment_id: int, session: AsyncSession = Depends(get_async_session)):
-    query = select(Comment).where(Comment.id == comment_id)
-    query_result = await session.scalars(query)
-    result = query_result.first()
+@cache(expire=s.cache_ttl, namespace="comment", key_builder=tagged("comment:{comment_id}"))
+async def get_comment(comment_id: int, loaders: Loaders = Depends(get_primary_loaders)):
+    result = await loaders.by(Comment.id).load(comment_id)
 
-    if result in None:
+    if result is None:
         raise HTTPException(status_code=404, detail="Não foi possível encontrar o comentário")
 
     return result
@@ -42,42 +56,86 @@ async def create_comment(payload: CommentCreate, session: AsyncSession = Depends
 
     session.add(new_comment)
     try:
+        await apply_rating_deltas(session, rating_delta(payload.event_id, new_comment.content, 1))
         await session.commit()
     except IntegrityError:
+        await session.rollback()
         raise HTTPException(status_code=400, detail="Comentário já foi cadastrado")
+    await invalidate(f"event:{payload.event_id}:ratings")
     return new_comment
 
+@router.post("/batch", response_model=BatchResponse)
+async def create_comments_batch(payload: List[CommentCreate], session: AsyncSession = Depends(get_async_session)):
+    check_batch_size(payload)
+    users = await existing_ids(session, User.id, (item.user_id for item in payload))
+    events = await existing_ids(session, Event.id, (item.event_id for item in payload))
+
+    failures, indexes, rows = {}, [], []
+    for index, item in enumerate(payload):
+        if item.user_id not in users:
+            failures[index] = BatchItemResult(index=index, status_code=404, detail="Usuário não encontrado")
+        elif item.event_id not in events:
+            failures[index] = BatchItemResult(index=index, status_code=404, detail="Evento não encontrado")
+        else:
+            indexes.append(index)
+            rows.append({"content": item.content.model_dump(), "user_id": item.user_id, "event_id": item.event_id})
+
+    deltas = Counter()
+    for row in rows:
+        deltas.update(rating_delta(row["event_id"], row["content"], 1))
+
+    try:
+        ids = await insert_many(session, Comment, rows)
+        await apply_rating_deltas(session, deltas)
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="Comentário já foi cadastrado")
+    await invalidate(*{f"event:{row['event_id']}:ratings" for row in rows})
+    return batch_response(failures, indexes, ids)
+
 @router.patch("/{comment_id}", response_model=CommentResponse)
 async def update_comment(comment_id: int, payload: CommentUpdate, session: AsyncSession = Depends(get_async_session)):
-    query = select(Comment).where(Comment.id == comment_id)
+    query = select(Comment).where(Comment.id == comment_id).with_for_update()
     query_result = await session.scalars(query)
     result = query_result.first()
 
     if result is None:
         raise HTTPException(status_code=404, detail="Não foi possível encontrar o comentário")
 
+    deltas = rating_delta(result.event_id, result.content, -1)
+    previous_event_id = result.event_id
+
     for field, value in payload.model_dump().items():
         if value is not None:
             setattr(result, field, value)
 
+    deltas.update(rating_delta(result.event_id, result.content, 1))
+
     try:
+        await apply_rating_deltas(session, deltas)
         await session.commit()
     except IntegrityError:
+        await session.rollback()
         raise HTTPException(status_code=400, detail="Comentário já foi cadastrado")
+    await invalidate(f"comment:{comment_id}", f"event:{previous_event_id}:ratings", f"event:{result.event_id}:ratings")
     return result
 
 @router.delete("/{comment_id}", status_code=204)
 async def delete_comment(comment_id: int, session: AsyncSession = Depends(get_async_session)):
-    query = select(Comment).where(Comment.id == comment_id)
+    query = select(Comment).where(Comment.id == comment_id).with_for_update()
     query_result = await session.scalars(query)
     result = query_result.first()
 
     if result is None:
         raise HTTPException(status_code=400, detail="Não foi possível encontrar o comentário")
 
-    session.delete(result)
+    await session.delete(result)
     try:
+        await apply_rating_deltas(session, rating_delta(result.event_id, result.content, -1))
         await session.commit()
     except IntegrityError:
+        await session.rollback()
         raise HTTPException(status_code=400, detail="Comentário já foi cadastrado")
-    return result
\ No newline at end of file
+    await invalidate(f"comment:{comment_id}", f"event:{result.event_id}:ratings")
+    return None
\ No newline at end of file
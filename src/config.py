@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import SecretStr, Field
+from typing import Literal
 import os
 
 current_directory = os.path.dirname(os.path.abspath(__file__))
@@ -15,11 +16,64 @@ class Settings(BaseSettings):
     db_pass: SecretStr
     db_name: str
 
+    db_pool_size: int = Field(10)
+    db_max_overflow: int = Field(20)
+    db_pool_timeout: float = Field(30)
+    db_pool_recycle: int = Field(1800)
+    db_pool_pre_ping: bool = Field(True)
+    db_statement_cache_size: int = Field(100)
+    db_replica_hosts: list[str] = Field([], examples=[["localhost:5433"]])
+    db_replica_strategy: Literal["round_robin", "least_connections"] = Field("round_robin")
+    db_read_your_writes_window: float = Field(0)
+
     secret_key: SecretStr
     algorithm: str
     access_token_expire_minutes: int
 
+    token_cache_size: int = Field(10000)
+    user_cache_size: int = Field(10000)
+    user_cache_ttl: float = Field(0)
+
+    bcrypt_rounds: int = Field(12)
+    password_hash_workers: int = Field(4)
+
+    page_default_limit: int = Field(50)
+    page_max_limit: int = Field(500)
+    export_batch_size: int = Field(1000)
+    fast_serialization: Literal["off", "validate", "trusted"] = Field("off")
+    batch_max_size: int = Field(1000)
+
+    cache_ttl: int = Field(3600)
+
+    jobs_in_process: bool = Field(True)
+    jobs_concurrency: int = Field(4)
+    jobs_max_retries: int = Field(3)
+    jobs_retry_backoff: float = Field(1)
+    jobs_result_ttl: int = Field(3600)
+    jobs_lease_ttl: int = Field(30)
+
+    loop_monitor_interval: float = Field(0.1)
+    loop_block_threshold: float = Field(0.25)
+    loop_monitor_strict: bool = Field(False)
+
+    server_timing: bool = Field(False)
+
     redis_host: str = Field("localhost")
     redis_port: int = Field(6379)
 
+    ws_queue_size: int = Field(100)
+    ws_slow_consumer_policy: Literal["drop", "disconnect"] = Field("drop")
+    ws_broadcast_channel: str = Field("ws:broadcast")
+    availability_channel: str = Field("events:availability")
+    availability_max_rate: float = Field(2)
+
+    inventory_flush_interval: float = Field(0.5)
+    inventory_flush_batch: int = Field(500)
+    inventory_reconcile_interval: float = Field(30)
+    inventory_hold_ttl: int = Field(3600)
+
+    upcoming_days: int = Field(30)
+    upcoming_refresh_interval: float = Field(60)
+    upcoming_rebuild_timeout: int = Field(300)
+
 settings = Settings()
\ No newline at end of file
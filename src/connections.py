@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+import statistics
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from fastapi import WebSocket
+
+from src.config import settings as s
+from src.redis_client import redis
+
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    def __init__(self, maxlen: int = 1000):
+        self.count = 0
+        self._samples: deque[float] = deque(maxlen=maxlen)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self._samples.append(seconds)
+
+    def stats(self) -> dict[str, float]:
+        if not self._samples:
+            return {"count": self.count, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        samples = sorted(self._samples)
+        return {
+            "count": self.count,
+            "p50_ms": statistics.median(samples) * 1000,
+            "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+            "max_ms": samples[-1] * 1000,
+        }
+
+
+class Connection:
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[tuple[str, float]] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.writer: Optional[asyncio.Task] = None
+
+
+class ConnectionManager:
+    """Mantém os websockets conectados, cada um com sua fila de saída e sua task de escrita.
+
+    Quando a fila de um cliente lento enche, a política "drop" descarta as
+    mensagens novas para esse cliente e "disconnect" fecha a conexão.
+    """
+
+    def __init__(self, queue_size: int = s.ws_queue_size, slow_consumer_policy: str = s.ws_slow_consumer_policy):
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.connections: dict[WebSocket, Connection] = {}
+        self.latency = LatencyWindow()
+        self.dropped_messages = 0
+        self.dropped_connections = 0
+        self._closing: set[asyncio.Task] = set()
+
+    async def connect(self, websocket: WebSocket) -> None:
+        # Registra antes do primeiro await, para que quem chama já conte com a conexão.
+        # A task de escrita só começa depois do accept.
+        connection = Connection(websocket, self.queue_size)
+        self.connections[websocket] = connection
+        try:
+            await websocket.accept()
+        except Exception:
+            self.disconnect(websocket)
+            raise
+        if self.connections.get(websocket) is connection:
+            connection.writer = asyncio.create_task(self._writer(connection))
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        connection = self.connections.pop(websocket, None)
+        if connection is not None and connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+
+    def send_text(self, websocket: WebSocket, text: str) -> None:
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            self._enqueue(connection, text, time.perf_counter())
+
+    def broadcast_text(self, text: str) -> int:
+        enqueued_at = time.perf_counter()
+        for connection in list(self.connections.values()):
+            self._enqueue(connection, text, enqueued_at)
+        return len(self.connections)
+
+    def broadcast(self, payload: Any) -> int:
+        return self.broadcast_text(json.dumps(payload))
+
+    def _enqueue(self, connection: Connection, text: str, enqueued_at: float) -> None:
+        try:
+            connection.queue.put_nowait((text, enqueued_at))
+        except asyncio.QueueFull:
+            if self.slow_consumer_policy == "disconnect":
+                self.dropped_connections += 1
+                self.disconnect(connection.websocket)
+                task = asyncio.create_task(self._close(connection.websocket))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+            else:
+                connection.dropped += 1
+                self.dropped_messages += 1
+
+    async def _writer(self, connection: Connection) -> None:
+        try:
+            while True:
+                text, enqueued_at = await connection.queue.get()
+                await connection.websocket.send_text(text)
+                self.latency.observe(time.perf_counter() - enqueued_at)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(connection.websocket)
+
+    async def _close(self, websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            logger.debug("Websocket já estava fechado")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "connections": len(self.connections),
+            "dropped_messages": self.dropped_messages,
+            "dropped_connections": self.dropped_connections,
+            "fanout_latency": self.latency.stats(),
+        }
+
+
+async def publish(payload: Any, channel: str = s.ws_broadcast_channel) -> int:
+    """Publica a mensagem no Redis para que todos os workers façam o broadcast local."""
+    return await redis.publish(channel, json.dumps(payload))
+
+
+async def listen(channel: str, handler: Callable[[bytes], None]) -> None:
+    """Assina o canal do Redis e chama handler para cada mensagem, reconectando em caso de erro."""
+    while True:
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    handler(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Conexão com o pub/sub do Redis perdida, reconectando")
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
+
+
+async def run_subscriber(manager: ConnectionManager, channel: str = s.ws_broadcast_channel) -> None:
+    await listen(channel, lambda data: manager.broadcast_text(data.decode()))
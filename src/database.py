@@ -1,22 +1,139 @@
+import itertools
+import time
+from http.cookies import SimpleCookie
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.config import settings as s
 
 
-DATABASE_URL = f"postgresql+asyncpg://{s.db_user}:{s.db_pass.get_secret_value()}@{s.db_host}:{s.db_port}/{s.db_name}"
+PRIMARY_COOKIE = "db_primary_until"
 
 
 class Base(DeclarativeBase):
     pass
 
-engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+
+class CountingQueuePool(AsyncAdaptedQueuePool):
+    """Pool que conta quantos checkouts estão aguardando uma conexão livre."""
+
+    waiting = 0
+
+    def _do_get(self):
+        self.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            self.waiting -= 1
+
+
+def database_url(host: str = s.db_host, port: int = s.db_port) -> str:
+    return f"postgresql+asyncpg://{s.db_user}:{s.db_pass.get_secret_value()}@{host}:{port}/{s.db_name}"
+
+
+def make_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=CountingQueuePool,
+        pool_size=s.db_pool_size,
+        max_overflow=s.db_max_overflow,
+        pool_timeout=s.db_pool_timeout,
+        pool_recycle=s.db_pool_recycle,
+        pool_pre_ping=s.db_pool_pre_ping,
+        connect_args={"statement_cache_size": s.db_statement_cache_size},
+    )
+
+
+def replica_url(replica: str) -> str:
+    host, _, port = replica.partition(":")
+    return database_url(host, int(port or s.db_port))
+
+
+DATABASE_URL = database_url()
+
+engine = make_engine(DATABASE_URL)
+replica_engines = [make_engine(replica_url(replica)) for replica in s.db_replica_hosts]
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+_round_robin = itertools.cycle(replica_engines)
+
+
+def pick_replica() -> AsyncEngine:
+    """Escolhe a réplica das leituras, ou o primário se não há réplicas configuradas."""
+    if not replica_engines:
+        return engine
+    if s.db_replica_strategy == "least_connections":
+        return min(replica_engines, key=lambda replica: replica.pool.checkedout() + replica.pool.waiting)
+    return next(_round_robin)
+
+
+def read_session_maker() -> AsyncSession:
+    return async_session_maker(bind=pick_replica())
+
+
+def get_pool_stats(engine: AsyncEngine = engine) -> dict[str, int]:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "waiting": pool.waiting,
+    }
+
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+def pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Sessão para rotas só de leitura: usa uma réplica, exceto logo depois de uma escrita do mesmo cliente.
+
+    Rotas com @cache não usam esta sessão: uma réplica atrasada deixaria o
+    dado antigo no cache por cache_ttl.
+    """
+    bind = engine if pinned_to_primary(request) else pick_replica()
+    async with async_session_maker(bind=bind) as session:
+        yield session
+
+
+class ReadYourWritesMiddleware:
+    """Depois de uma escrita, marca o cliente para ler do primário por db_read_your_writes_window segundos.
+
+    ASGI puro: o cookie entra nos headers de http.response.start, sem a task extra do BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + s.db_read_your_writes_window
+                cookie = SimpleCookie()
+                cookie[PRIMARY_COOKIE] = f"{until:.3f}"
+                cookie[PRIMARY_COOKIE].update(
+                    {"max-age": int(s.db_read_your_writes_window) + 1, "path": "/", "httponly": True, "samesite": "lax"}
+                )
+                MutableHeaders(scope=message).append("Set-Cookie", cookie.output(header="").strip())
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
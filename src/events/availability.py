@@ -0,0 +1,104 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+
+from fastapi import WebSocket
+from sqlalchemy import select
+
+from src.config import settings as s
+from src.connections import ConnectionManager, listen
+from src.database import async_session_maker
+from src.events.models import Event
+from src.redis_client import redis
+# Import do módulo, e não dos nomes, porque inventory também importa este módulo.
+from src.reservations import inventory
+
+
+logger = logging.getLogger(__name__)
+
+
+async def get_availability(event_id: int) -> Optional[dict]:
+    async with async_session_maker() as session:
+        query = select(Event.capacity, Event.reserved_seats).where(Event.id == event_id)
+        query_result = await session.execute(query)
+        row = query_result.first()
+
+    if row is None:
+        return None
+
+    available = await inventory.remaining_seats(event_id, row.capacity, row.reserved_seats)
+    return {"event_id": event_id, "capacity": row.capacity, "available": available}
+
+
+class AvailabilityHub:
+    """Canais de disponibilidade por evento.
+
+    Notificações do mesmo evento são agrupadas: no máximo max_rate
+    atualizações por segundo são enviadas aos assinantes de cada evento.
+    """
+
+    def __init__(self, max_rate: float = s.availability_max_rate):
+        self.min_interval = 1 / max_rate
+        self.managers: dict[int, ConnectionManager] = {}
+        self._pending: dict[int, asyncio.Task] = {}
+        self._last_sent: dict[int, float] = {}
+
+    async def connect(self, event_id: int, websocket: WebSocket) -> None:
+        # manager.connect registra o websocket antes de qualquer await, então um
+        # disconnect concorrente não apaga o manager enquanto o accept roda.
+        manager = self.managers.setdefault(event_id, ConnectionManager())
+        try:
+            await manager.connect(websocket)
+            availability = await get_availability(event_id)
+        except Exception:
+            self.disconnect(event_id, websocket)
+            raise
+        if availability is not None:
+            manager.send_text(websocket, json.dumps(availability))
+
+    def disconnect(self, event_id: int, websocket: WebSocket) -> None:
+        manager = self.managers.get(event_id)
+        if manager is None:
+            return
+        manager.disconnect(websocket)
+        if not manager.connections:
+            del self.managers[event_id]
+            self._last_sent.pop(event_id, None)
+
+    def notify(self, event_id: int) -> None:
+        if event_id not in self.managers or event_id in self._pending:
+            return
+        delay = max(0.0, self._last_sent.get(event_id, 0.0) + self.min_interval - time.monotonic())
+        self._pending[event_id] = asyncio.create_task(self._flush(event_id, delay))
+
+    async def _flush(self, event_id: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+        # Sai de _pending antes de ler o banco para que mudanças durante a leitura agendem outro envio.
+        del self._pending[event_id]
+        self._last_sent[event_id] = time.monotonic()
+        try:
+            availability = await get_availability(event_id)
+            manager = self.managers.get(event_id)
+            if manager is not None and availability is not None:
+                manager.broadcast(availability)
+        except Exception:
+            logger.exception("Falha ao enviar a disponibilidade do evento %s", event_id)
+
+
+hub = AvailabilityHub()
+
+
+async def publish_availability(*event_ids: int) -> None:
+    """Avisa todos os workers que a disponibilidade dos eventos mudou."""
+    for event_id in set(event_ids):
+        try:
+            await redis.publish(s.availability_channel, event_id)
+        except Exception:
+            logger.exception("Falha ao publicar a disponibilidade do evento %s", event_id)
+            hub.notify(event_id)
+
+
+async def run_availability_subscriber() -> None:
+    await listen(s.availability_channel, lambda data: hub.notify(int(data)))
@@ -0,0 +1,41 @@
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from pydantic import PositiveInt
+from sqlalchemy import Select
+
+from src.events.models import Event
+from src.schemas import UTCDatetime
+
+
+class EventFilters:
+    def __init__(
+        self,
+        date_from: Optional[UTCDatetime] = Query(None),
+        date_to: Optional[UTCDatetime] = Query(None),
+        location: Optional[str] = Query(None, min_length=3, max_length=50, examples=["São Carlos"]),
+        user_id: Optional[PositiveInt] = Query(None),
+        has_capacity: Optional[bool] = Query(None),
+    ):
+        if date_from is not None and date_to is not None and date_from > date_to:
+            raise HTTPException(status_code=400, detail="date_from maior que date_to")
+        self.date_from = date_from
+        self.date_to = date_to
+        self.location = location
+        self.user_id = user_id
+        self.has_capacity = has_capacity
+
+    def apply(self, query: Select) -> Select:
+        if self.date_from is not None:
+            query = query.where(Event.date >= self.date_from)
+        if self.date_to is not None:
+            query = query.where(Event.date <= self.date_to)
+        if self.location is not None:
+            query = query.where(Event.location == self.location)
+        if self.user_id is not None:
+            query = query.where(Event.user_id == self.user_id)
+        if self.has_capacity is True:
+            query = query.where(Event.reserved_seats < Event.capacity)
+        elif self.has_capacity is False:
+            query = query.where(Event.reserved_seats >= Event.capacity)
+        return query
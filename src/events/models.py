@@ -1,24 +1,55 @@
 from typing import List
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, Text, ForeignKey, DateTime, func
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Integer, SmallInteger, Text, Boolean, ForeignKey, DateTime, func, Index, false, Computed, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 
 from src.database import Base
 from datetime import datetime
 
+
+SEARCH_CONFIG = "portuguese"
+
+# Nome pesa mais que o local, que pesa mais que os textos dentro de content.
+SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(location, '')), 'B') || "
+    f"setweight(jsonb_to_tsvector('{SEARCH_CONFIG}', coalesce(content, '{{}}'), '[\"string\"]'), 'C')"
+)
+
+
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_created_at_id", "created_at", "id"),
+        Index("ix_events_content", "content", postgresql_using="gin"),
+        Index("ix_events_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_events_location_date", "location", "date"),
+        Index("ix_events_date_available", "date", postgresql_where=text("reserved_seats < capacity")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(Text)
-    date: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    date: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     location: Mapped[str] = mapped_column(Text)
     capacity: Mapped[int] = mapped_column(Integer, default=10)
+    reserved_seats: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    flash_sale: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
     content: Mapped[JSONB] = mapped_column(JSONB)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"), index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True), deferred=True, deferred_raiseload=True)
+
+    user: Mapped["User"] = relationship(back_populates="events", lazy="raise")
+    comments: Mapped[List["Comment"]] = relationship(back_populates="event", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+    reservations: Mapped[List["Reservation"]] = relationship(back_populates="event", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+
+
+class EventRating(Base):
+    """Quantidade de comentários do evento com cada nota, mantida pelo router de comentários."""
+
+    __tablename__ = "event_ratings"
 
-    user: Mapped["User"] = relationship(back_populates="events")
-    comments: Mapped[List["Comment"]] = relationship(back_populates="event", cascade="all, delete-orphan")
-    reservations: Mapped[List["Reservation"]] = relationship(back_populates="event", cascade="all, delete-orphan")
\ No newline at end of file
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True)
+    rating: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
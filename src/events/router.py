@@ -1,11 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from src.database import get_async_session
-from src.events.models import Event
-from src.events.schemas import EventResponse, EventCreate, EventUpdate
-from sqlalchemy import select
+from src.database import get_async_session, get_read_session
+from src.loaders import Loaders, get_primary_loaders
+from src.events.models import Event, SEARCH_CONFIG
+from src.users.models import User
+from src.events.schemas import EventResponse, EventCreate, EventUpdate, EventRatings, EventFull
+from src.comments.ratings import get_ratings
+from src.reservations.seats import event_exists
+from src.events.filters import EventFilters
+from src.events.availability import publish_availability
+from src.events.upcoming import get_upcoming, refresh_upcoming
+from src.pagination import Page, PageParams, paginate, paginate_ranked, fields_param
+from src.export import ndjson_response
+from src.batch import check_batch_size, existing_ids, insert_many, batch_response
+from src.schemas import BatchItemResult, BatchResponse
+from src.reservations.inventory import open_inventory, close_inventory, adjust_capacity, remaining_seats
+from src.reservations.models import Reservation
+from src.comments.models import Comment
+from src.cache import tagged, invalidate, invalidate_events, event_tags, cache
+from src.config import settings as s
+from sqlalchemy import select, func, literal_column, true
+from sqlalchemy.orm import selectinload
 
 router = APIRouter(
     prefix="/events",
@@ -13,26 +30,83 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=List[EventResponse])
-async def get_events(session: AsyncSession = Depends(get_async_session)):
-    query = select(Event)
-    query_result = await session.scalars(query)
-    result = query_result.all()
+@router.get("/", response_model=Page[EventResponse])
+@cache(expire=s.cache_ttl, namespace="events", key_builder=tagged("events:list"))
+async def get_events(filters: EventFilters = Depends(), page: PageParams = Depends(), fields: Optional[List[str]] = Depends(fields_param(EventResponse)), session: AsyncSession = Depends(get_async_session)):
+    query = filters.apply(select(Event))
+    return await paginate(session, query, Event, page, fields, EventResponse)
 
-    return result
+
+@router.get("/export")
+async def export_events():
+    query = select(Event).order_by(Event.id)
+    return ndjson_response(query, EventResponse)
+
+
+@router.get("/upcoming", response_model=List[EventResponse])
+async def get_upcoming_events(limit: int = Query(s.page_default_limit, ge=1, le=s.page_max_limit)):
+    """Próximos eventos por data, lidos da lista pré-computada no Redis."""
+    return Response(content=b"[" + b",".join(await get_upcoming(limit)) + b"]", media_type="application/json")
+
+
+@router.get("/search", response_model=Page[EventResponse])
+@cache(expire=s.cache_ttl, namespace="events_search", key_builder=tagged("events:list"))
+async def search_events(q: str = Query(..., min_length=1, max_length=200), page: PageParams = Depends(), session: AsyncSession = Depends(get_async_session)):
+    ts_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+    query = select(Event).where(Event.search_vector.bool_op("@@")(ts_query))
+    return await paginate_ranked(session, query, func.ts_rank(Event.search_vector, ts_query), Event, page, EventResponse)
 
 
 @router.get("/{event_id}", response_model=EventResponse)
-async def get_event(event_id: int, session: AsyncSession = Depends(get_async_session)):
-    query = select(Event).where(Event.id == event_id)
-    query_result = await session.scalars(query)
-    result = query_result.first()
+@cache(expire=s.cache_ttl, namespace="event", key_builder=tagged("event:{event_id}"))
+async def get_event(event_id: int, loaders: Loaders = Depends(get_primary_loaders)):
+    result = await loaders.by(Event.id).load(event_id)
 
     if result is None:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
     
     return result
 
+@router.get("/{event_id}/full", response_model=EventFull)
+async def get_event_full(event_id: int, comments_limit: int = Query(s.page_default_limit, ge=1, le=s.page_max_limit), session: AsyncSession = Depends(get_read_session)):
+    """Evento, dono, primeira página de comentários e totais das reservas em três queries."""
+    totals = (
+        select(func.count(Reservation.id).label("reservations"), func.coalesce(func.sum(Reservation.num_guests), 0).label("guests"))
+        .where(Reservation.event_id == event_id)
+        .subquery()
+    )
+    query = (
+        select(Event, totals.c.reservations, totals.c.guests)
+        .join(totals, true())
+        .options(selectinload(Event.user))
+        .where(Event.id == event_id)
+    )
+    query_result = await session.execute(query)
+    result = query_result.first()
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    event = result.Event
+    comments = await paginate(session, select(Comment).where(Comment.event_id == event_id), Comment, PageParams(cursor=None, limit=comments_limit))
+
+    return {
+        "event": event,
+        "owner": event.user,
+        "comments": comments,
+        "reservations": {"count": result.reservations, "guests": result.guests},
+        "remaining_capacity": await remaining_seats(event_id, event.capacity, event.reserved_seats),
+    }
+
+
+@router.get("/{event_id}/ratings", response_model=EventRatings)
+@cache(expire=s.cache_ttl, namespace="event_ratings", key_builder=tagged("event:{event_id}:ratings"))
+async def get_event_ratings(event_id: int, session: AsyncSession = Depends(get_async_session)):
+    ratings = await get_ratings(session, event_id)
+    if ratings["count"] == 0 and not await event_exists(session, event_id):
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    return ratings
+
 @router.post("/", response_model=EventResponse)
 async def create_event(payload: EventCreate, session: AsyncSession = Depends(get_async_session)):
     new_event = Event(
@@ -50,16 +124,46 @@ async def create_event(payload: EventCreate, session: AsyncSession = Depends(get
         await session.commit()
     except IntegrityError:
         raise HTTPException(status_code=400, detail="Evento já foi cadastrado") 
+    await invalidate(*event_tags(new_event.id, new_event.user_id))
+    await refresh_upcoming([new_event])
     return new_event
 
+@router.post("/batch", response_model=BatchResponse)
+async def create_events_batch(payload: List[EventCreate], session: AsyncSession = Depends(get_async_session)):
+    check_batch_size(payload)
+    users = await existing_ids(session, User.id, (item.user_id for item in payload))
+
+    failures, indexes, rows = {}, [], []
+    for index, item in enumerate(payload):
+        if item.user_id not in users:
+            failures[index] = BatchItemResult(index=index, status_code=404, detail="Usuário não encontrado")
+        else:
+            indexes.append(index)
+            rows.append(item.model_dump())
+
+    ids = await insert_many(session, Event, rows)
+
+    try:
+        await session.commit()
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Evento já foi cadastrado")
+    await invalidate_events(session, ids)
+    return batch_response(failures, indexes, ids)
+
 @router.patch("/{event_id}", response_model=EventResponse)
 async def update_event(event_id: int, payload: EventUpdate, session: AsyncSession = Depends(get_async_session)):
-    query = select(Event).where(Event.id == event_id)
+    query = select(Event).where(Event.id == event_id).with_for_update()
     query_result = await session.scalars(query)
     result = query_result.first()
 
     if result is None:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    if payload.capacity is not None and payload.capacity < result.reserved_seats:
+        raise HTTPException(status_code=400, detail="Capacidade menor que o número de lugares reservados")
+
+    previous_user_id = result.user_id
+    previous_capacity = result.capacity
     
     for field, value in payload.model_dump().items():
         if value is not None:
@@ -69,6 +173,11 @@ async def update_event(event_id: int, payload: EventUpdate, session: AsyncSessio
         await session.commit()
     except IntegrityError:
         raise HTTPException(status_code=400, detail="Evento já foi cadastrado")
+    await adjust_capacity(event_id, result.capacity - previous_capacity)
+    await invalidate(*event_tags(event_id, previous_user_id), f"user:{result.user_id}:events")
+    await refresh_upcoming([result])
+    if result.capacity != previous_capacity:
+        await publish_availability(event_id)
     return result
 
 
@@ -80,11 +189,53 @@ async def delete_event(event_id: int, session: AsyncSession = Depends(get_async_
 
     if result is None:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    query_result = await session.scalars(select(Comment.id).where(Comment.event_id == event_id))
+    comment_tags = [f"comment:{comment_id}" for comment_id in query_result.all()]
     
-    session.delete(result)
+    await session.delete(result)
 
     try:
         await session.commit()
     except IntegrityError:
         raise HTTPException(status_code=400, detail="Evento já foi cadastrado")
-    return result
\ No newline at end of file
+    await invalidate(*event_tags(event_id, result.user_id), *comment_tags)
+    await refresh_upcoming(deleted_ids=[event_id])
+    return None
+
+
+@router.post("/{event_id}/flash_sale", response_model=EventResponse)
+async def enable_flash_sale(event_id: int, session: AsyncSession = Depends(get_async_session)):
+    query = select(Event).where(Event.id == event_id)
+    query_result = await session.scalars(query)
+    result = query_result.first()
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    result.flash_sale = True
+    await session.commit()
+    # Relê reserved_seats depois do commit para contar as reservas feitas desde o SELECT.
+    await session.refresh(result)
+    await open_inventory(result)
+    await invalidate(*event_tags(event_id, result.user_id))
+    await refresh_upcoming([result])
+    return result
+
+
+@router.delete("/{event_id}/flash_sale", response_model=EventResponse)
+async def disable_flash_sale(event_id: int, session: AsyncSession = Depends(get_async_session)):
+    query = select(Event).where(Event.id == event_id)
+    query_result = await session.scalars(query)
+    result = query_result.first()
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    await close_inventory(event_id)
+    result.flash_sale = False
+    await session.commit()
+    await session.refresh(result)
+    await invalidate(*event_tags(event_id, result.user_id))
+    await refresh_upcoming([result])
+    return result
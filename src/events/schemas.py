@@ -1,5 +1,8 @@
-from typing import Optional
-from src.schemas import CustomBase
+from typing import Dict, Optional
+from src.schemas import CustomBase, UTCDatetime
+from src.pagination import Page
+from src.users.schemas import UserResponse
+from src.comments.schemas import CommentResponse
 from pydantic import PositiveInt, Field
 from datetime import datetime
 
@@ -9,6 +12,8 @@ class EventResponse(CustomBase):
     date: datetime
     location: str = Field(..., min_length=3, max_length=50, examples=["São Carlos"])
     capacity: PositiveInt = Field(..., examples=[100])
+    reserved_seats: int = Field(..., ge=0, examples=[0])
+    flash_sale: bool
     user_id: PositiveInt = Field(..., examples=[1])
     content: dict
     created_at: datetime
@@ -16,7 +21,7 @@ class EventResponse(CustomBase):
 
 class EventCreate(CustomBase):
     name: str = Field(...,min_length=3, max_length=50, examples=["Festival da batata"])
-    date: datetime
+    date: UTCDatetime
     location: str = Field(..., min_length=3, max_length=50, examples=["São Carlos"])
     capacity: PositiveInt = Field(..., examples=[100])
     user_id: PositiveInt = Field(..., examples=[1])
@@ -25,8 +30,29 @@ class EventCreate(CustomBase):
 
 class EventUpdate(CustomBase):
     name: Optional[str] = Field(None, min_length=3, max_length=50, examples=["Festival da batata"])
-    date: Optional[datetime] = Field(None)
+    date: Optional[UTCDatetime] = Field(None)
     location: Optional[str] = Field(None, min_length=3, max_length=50, examples=["São Carlos"])
     capacity: Optional[PositiveInt] = Field(None, examples=[100])
     user_id: Optional[PositiveInt] = Field(None, examples=[1])
-    content: Optional[dict] = Field(None)
\ No newline at end of file
+    content: Optional[dict] = Field(None)
+
+
+class EventRatings(CustomBase):
+    event_id: PositiveInt = Field(..., examples=[1])
+    count: int = Field(..., ge=0, examples=[3])
+    sum: int = Field(..., ge=0, examples=[21])
+    average: Optional[float] = Field(None, examples=[7.0])
+    histogram: Dict[int, int] = Field(..., examples=[{5: 1, 8: 2}])
+
+
+class ReservationTotals(CustomBase):
+    count: int = Field(..., ge=0, examples=[12])
+    guests: int = Field(..., ge=0, examples=[30])
+
+
+class EventFull(CustomBase):
+    event: EventResponse
+    owner: UserResponse
+    comments: Page[CommentResponse]
+    reservations: ReservationTotals
+    remaining_capacity: int = Field(..., examples=[70])
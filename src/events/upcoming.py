@@ -0,0 +1,155 @@
+"""Lista pré-computada dos próximos eventos, mantida no Redis.
+
+Um sorted set guarda os ids dos eventos dos próximos upcoming_days dias com a
+data como score, e um hash guarda o EventResponse de cada um. As escritas
+atualizam só os eventos que mudaram, e um refresher periódico remove os que
+já passaram e adiciona os que entraram na janela, sem reconstruir tudo.
+
+A reconstrução completa, na subida da app, é feita por um worker só (lock no
+Redis) em chaves temporárias, que substituem as atuais atomicamente no fim.
+Enquanto ela roda, as escritas atualizam as duas cópias.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import select
+
+from src.config import settings as s
+from src.database import async_session_maker
+from src.events.models import Event
+from src.events.schemas import EventResponse
+from src.redis_client import redis
+from src.schemas import as_utc
+
+
+logger = logging.getLogger(__name__)
+
+UPCOMING_KEY = "events:upcoming"
+UPCOMING_DATA_KEY = "events:upcoming:data"
+REBUILD_KEY = "events:upcoming:rebuild"
+REBUILD_KEYS = ("events:upcoming:rebuild:ids", "events:upcoming:rebuild:data")
+
+# Troca as chaves temporárias pelas atuais se o lock ainda for deste worker.
+# O RENAME carrega o TTL da temporária, então o PERSIST tira o TTL de volta.
+SWAP_SCRIPT = redis.register_script("""
+if redis.call("get", KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+for i = 2, 3 do
+    if redis.call("exists", KEYS[i]) == 1 then
+        redis.call("rename", KEYS[i], KEYS[i + 2])
+        redis.call("persist", KEYS[i + 2])
+    else
+        redis.call("del", KEYS[i + 2])
+    end
+end
+redis.call("del", KEYS[1])
+return 1
+""")
+
+RELEASE_SCRIPT = redis.register_script("""
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+""")
+
+
+def window() -> tuple[datetime, datetime]:
+    now = datetime.now(timezone.utc)
+    return now, now + timedelta(days=s.upcoming_days)
+
+
+async def refresh_upcoming(events: Iterable[Event] = (), deleted_ids: Iterable[int] = ()) -> None:
+    """Atualiza a lista com o estado atual dos eventos alterados ou apagados."""
+    targets = [(UPCOMING_KEY, UPCOMING_DATA_KEY)]
+    if await redis.exists(REBUILD_KEY):
+        targets.append(REBUILD_KEYS)
+    await write_upcoming(targets, list(events), deleted_ids)
+
+
+async def write_upcoming(targets: list[tuple[str, str]], events: Iterable[Event], deleted_ids: Iterable[int] = ()) -> None:
+    start, end = window()
+    async with redis.pipeline(transaction=True) as pipe:
+        for ids_key, data_key in targets:
+            for event in events:
+                date = as_utc(event.date)
+                if start <= date <= end:
+                    pipe.zadd(ids_key, {event.id: date.timestamp()})
+                    pipe.hset(data_key, event.id, EventResponse.model_validate(event, from_attributes=True).model_dump_json())
+                else:
+                    pipe.zrem(ids_key, event.id)
+                    pipe.hdel(data_key, event.id)
+            for event_id in deleted_ids:
+                pipe.zrem(ids_key, event_id)
+                pipe.hdel(data_key, event_id)
+        for ids_key, data_key in targets[1:]:
+            pipe.expire(ids_key, s.upcoming_rebuild_timeout)
+            pipe.expire(data_key, s.upcoming_rebuild_timeout)
+        await pipe.execute()
+
+
+async def get_upcoming(limit: int) -> list[bytes]:
+    start, _ = window()
+    ids = await redis.zrangebyscore(UPCOMING_KEY, start.timestamp(), "+inf", start=0, num=limit)
+    if not ids:
+        return []
+    return [value for value in await redis.hmget(UPCOMING_DATA_KEY, ids) if value is not None]
+
+
+async def load_window(start: datetime, end: datetime, rebuild: bool = False) -> None:
+    async with async_session_maker() as session:
+        query = select(Event).where(Event.date >= start, Event.date <= end)
+        result = await session.stream_scalars(query.execution_options(yield_per=s.export_batch_size))
+        async for events in result.partitions():
+            if rebuild:
+                await write_upcoming([REBUILD_KEYS], events)
+            else:
+                await refresh_upcoming(events)
+            session.expunge_all()
+
+
+async def rebuild_upcoming(start: datetime, end: datetime) -> bool:
+    """Reconstrói a lista inteira sem esvaziá-la. Retorna False se outro worker já está reconstruindo."""
+    token = uuid.uuid4().hex
+    if not await redis.set(REBUILD_KEY, token, nx=True, ex=s.upcoming_rebuild_timeout):
+        return False
+    try:
+        await redis.delete(*REBUILD_KEYS)
+        await load_window(start, end, rebuild=True)
+        swapped = await SWAP_SCRIPT(keys=[REBUILD_KEY, *REBUILD_KEYS, UPCOMING_KEY, UPCOMING_DATA_KEY], args=[token])
+        if not swapped:
+            logger.warning("Lock da reconstrução dos próximos eventos expirou; a lista atual foi mantida")
+        return bool(swapped)
+    finally:
+        await RELEASE_SCRIPT(keys=[REBUILD_KEY], args=[token])
+
+
+async def prune_upcoming(now: datetime) -> None:
+    expired = await redis.zrangebyscore(UPCOMING_KEY, "-inf", f"({now.timestamp()}")
+    if expired:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(UPCOMING_KEY, *expired)
+            pipe.hdel(UPCOMING_DATA_KEY, *expired)
+            await pipe.execute()
+
+
+async def run_upcoming_refresher() -> None:
+    start, horizon = window()
+    try:
+        await rebuild_upcoming(start, horizon)
+        await prune_upcoming(start)
+    except Exception:
+        logger.exception("Falha ao reconstruir a lista de próximos eventos")
+    while True:
+        await asyncio.sleep(s.upcoming_refresh_interval)
+        try:
+            start, end = window()
+            await load_window(horizon, end)
+            await prune_upcoming(start)
+            horizon = end
+        except Exception:
+            logger.exception("Falha ao atualizar a lista de próximos eventos")
@@ -0,0 +1,24 @@
+from typing import AsyncIterator, Type
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from src.config import settings as s
+from src.database import read_session_maker
+from src.schemas import CustomBase
+
+
+async def iter_ndjson(query: Select, schema: Type[CustomBase], batch_size: int) -> AsyncIterator[bytes]:
+    async with read_session_maker() as session:
+        result = await session.stream_scalars(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield b"".join(
+                schema.model_validate(row, from_attributes=True).model_dump_json().encode() + b"\n"
+                for row in rows
+            )
+            session.expunge_all()
+
+
+def ndjson_response(query: Select, schema: Type[CustomBase], batch_size: int = s.export_batch_size) -> StreamingResponse:
+    """Exporta o resultado da query em NDJSON usando um cursor do lado do servidor."""
+    return StreamingResponse(iter_ndjson(query, schema, batch_size), media_type="application/x-ndjson")
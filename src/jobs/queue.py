@@ -0,0 +1,234 @@
+"""Fila de jobs em Redis.
+
+Os jobs ficam em um hash jobs:{id} com status, argumentos e resultado, e os ids
+aguardando execução na lista jobs:queue. As novas tentativas esperam no sorted
+set jobs:retry com o horário em que vencem, e os workers as devolvem para a
+fila. Um job em execução fica na lista jobs:processing com um lease renovado
+pelo worker; se o worker cai, o lease expira e o job volta para a fila. Os workers rodam dentro da app (Settings.jobs_in_process) ou separados
+com python -m src.jobs.worker.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from src.config import settings as s
+from src.redis_client import redis
+
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "jobs:queue"
+RETRY_KEY = "jobs:retry"
+PROCESSING_KEY = "jobs:processing"
+
+JOBS: dict[str, Callable[..., Awaitable[Any]]] = {}
+
+PROMOTE_SCRIPT = redis.register_script("""
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job_id in ipairs(due) do
+    redis.call('ZREM', KEYS[1], job_id)
+    redis.call('LPUSH', KEYS[2], job_id)
+end
+return #due
+""")
+
+
+# Um id sem lease em jobs:processing só volta para a fila depois de ficar sem
+# lease por ARGV[2] segundos, para não pegar o instante entre o BLMOVE e o SET
+# do lease.
+REQUEUE_STALE_SCRIPT = redis.register_script("""
+local requeued = 0
+for _, job_id in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    local lease = 'jobs:' .. job_id .. ':lease'
+    local seen = 'jobs:' .. job_id .. ':stale'
+    if redis.call('EXISTS', lease) == 1 then
+        redis.call('DEL', seen)
+    else
+        local since = redis.call('GET', seen)
+        if not since then
+            redis.call('SET', seen, ARGV[1], 'EX', ARGV[2] * 3)
+        elseif tonumber(ARGV[1]) - tonumber(since) >= tonumber(ARGV[2]) then
+            redis.call('LREM', KEYS[1], 0, job_id)
+            redis.call('LPUSH', KEYS[2], job_id)
+            redis.call('DEL', seen)
+            requeued = requeued + 1
+        end
+    end
+end
+return requeued
+""")
+
+
+class UnknownJob(Exception):
+    pass
+
+
+class InvalidJobArgs(Exception):
+    pass
+
+
+def job(name: str):
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        JOBS[name] = func
+        return func
+    return decorator
+
+
+def job_key(job_id: str) -> str:
+    return f"jobs:{job_id}"
+
+
+def lease_key(job_id: str) -> str:
+    return f"jobs:{job_id}:lease"
+
+
+def check_args(name: str, args: dict) -> None:
+    try:
+        inspect.signature(JOBS[name]).bind(**args)
+    except TypeError as error:
+        raise InvalidJobArgs(str(error))
+
+
+async def enqueue(name: str, args: Optional[dict] = None, job_id: Optional[str] = None) -> str:
+    if name not in JOBS:
+        raise UnknownJob(name)
+    check_args(name, args or {})
+    job_id = job_id or uuid.uuid4().hex
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(job_key(job_id), mapping={
+            "id": job_id,
+            "name": name,
+            "args": json.dumps(args or {}),
+            "status": "queued",
+            "attempts": 0,
+            "created_at": time.time(),
+        })
+        pipe.expire(job_key(job_id), s.jobs_result_ttl)
+        pipe.lpush(QUEUE_KEY, job_id)
+        await pipe.execute()
+    return job_id
+
+
+async def enqueue_once(name: str, args: Optional[dict] = None, window: int = s.cache_ttl) -> str:
+    """Um job por janela: chamadas com o mesmo nome e argumentos dentro de window segundos recebem o mesmo id."""
+    if name not in JOBS:
+        raise UnknownJob(name)
+    check_args(name, args or {})
+    key = f"jobs:once:{name}:{json.dumps(args or {}, sort_keys=True)}"
+    job_id = uuid.uuid4().hex
+    if not await redis.set(key, job_id, nx=True, ex=window):
+        existing = await redis.get(key)
+        if existing is not None:
+            return existing.decode()
+    return await enqueue(name, args, job_id)
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    data = await redis.hgetall(job_key(job_id))
+    if not data:
+        return None
+    data = {key.decode(): value.decode() for key, value in data.items()}
+    return {
+        "id": data["id"],
+        "name": data["name"],
+        "status": data["status"],
+        "attempts": int(data["attempts"]),
+        "result": json.loads(data["result"]) if "result" in data else None,
+        "error": data.get("error"),
+    }
+
+
+async def promote_due_retries(limit: int = 100) -> int:
+    """Devolve para a fila as novas tentativas que já venceram."""
+    return await PROMOTE_SCRIPT(keys=[RETRY_KEY, QUEUE_KEY], args=[time.time(), limit])
+
+
+async def requeue_stale() -> int:
+    """Devolve para a fila os jobs de workers que caíram durante a execução."""
+    return await REQUEUE_STALE_SCRIPT(keys=[PROCESSING_KEY, QUEUE_KEY], args=[time.time(), s.jobs_lease_ttl])
+
+
+async def keep_lease(job_id: str) -> None:
+    while True:
+        await asyncio.sleep(s.jobs_lease_ttl / 3)
+        await redis.set(lease_key(job_id), 1, ex=s.jobs_lease_ttl)
+
+
+async def run_claimed(job_id: str) -> None:
+    """Roda um job já movido para jobs:processing, renovando o lease enquanto ele roda."""
+    await redis.set(lease_key(job_id), 1, ex=s.jobs_lease_ttl)
+    heartbeat = asyncio.create_task(keep_lease(job_id))
+    try:
+        await run_job(job_id)
+    finally:
+        heartbeat.cancel()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(PROCESSING_KEY, 1, job_id)
+            pipe.delete(lease_key(job_id))
+            await pipe.execute()
+
+
+async def run_job(job_id: str) -> None:
+    key = job_key(job_id)
+    data = await redis.hmget(key, "name", "args", "attempts", "status")
+    if data[0] is None:
+        return
+
+    name, args, attempts = data[0].decode(), json.loads(data[1]), int(data[2]) + 1
+    if data[3] == b"running" and attempts > s.jobs_max_retries + 1:
+        # Voltou para a fila por requeue_stale depois de derrubar workers demais.
+        logger.error("Job %s (%s) interrompido %s vezes", job_id, name, attempts - 1)
+        await redis.hset(key, mapping={"status": "failed", "error": "Worker caiu durante a execução"})
+        return
+    await redis.hset(key, mapping={"status": "running", "attempts": attempts})
+    try:
+        check_args(name, args)
+        result = await JOBS[name](**args)
+    except InvalidJobArgs as error:
+        logger.error("Job %s (%s) com argumentos inválidos: %s", job_id, name, error)
+        await redis.hset(key, mapping={"status": "failed", "error": repr(error)})
+        return
+    except Exception as error:
+        if attempts <= s.jobs_max_retries:
+            logger.warning("Job %s (%s) falhou, tentativa %s", job_id, name, attempts, exc_info=True)
+            due = time.time() + s.jobs_retry_backoff * 2 ** (attempts - 1)
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={"status": "queued", "error": repr(error)})
+                pipe.zadd(RETRY_KEY, {job_id: due})
+                await pipe.execute()
+        else:
+            logger.exception("Job %s (%s) falhou definitivamente", job_id, name)
+            await redis.hset(key, mapping={"status": "failed", "error": repr(error)})
+        return
+
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={"status": "done", "result": json.dumps(result)})
+        pipe.hdel(key, "error")
+        pipe.expire(key, s.jobs_result_ttl)
+        await pipe.execute()
+
+
+async def worker() -> None:
+    last_reap = time.monotonic()
+    while True:
+        try:
+            await promote_due_retries()
+            if time.monotonic() - last_reap >= s.jobs_lease_ttl:
+                await requeue_stale()
+                last_reap = time.monotonic()
+            job_id = await redis.blmove(QUEUE_KEY, PROCESSING_KEY, 1, "RIGHT", "LEFT")
+            if job_id is not None:
+                await run_claimed(job_id.decode())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Erro no worker de jobs")
+            await asyncio.sleep(1)
+
+
+async def run_workers(concurrency: int = s.jobs_concurrency) -> None:
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Body, HTTPException
+from src.jobs.queue import enqueue, get_job, UnknownJob, InvalidJobArgs
+from src.jobs.schemas import JobSubmitted, JobResponse
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"]
+)
+
+
+@router.post("/{name}", response_model=JobSubmitted, status_code=202)
+async def submit_job(name: str, payload: dict = Body({})):
+    try:
+        job_id = await enqueue(name, payload)
+    except UnknownJob:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    except InvalidJobArgs as error:
+        raise HTTPException(status_code=400, detail=f"Argumentos inválidos para o job: {error}")
+
+    return {"job_id": job_id}
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: str):
+    result = await get_job(job_id)
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+
+    return result
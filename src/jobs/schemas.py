@@ -0,0 +1,16 @@
+from typing import Any, Optional
+from src.schemas import CustomBase
+from pydantic import Field
+
+
+class JobSubmitted(CustomBase):
+    job_id: str
+
+
+class JobResponse(CustomBase):
+    id: str
+    name: str = Field(..., examples=["long_operation"])
+    status: str = Field(..., examples=["done"])
+    attempts: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
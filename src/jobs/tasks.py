@@ -0,0 +1,9 @@
+import asyncio
+
+from src.jobs.queue import job
+
+
+@job("long_operation")
+async def long_operation() -> dict:
+    await asyncio.sleep(3)
+    return {"operation": "longo"}
@@ -0,0 +1,10 @@
+import asyncio
+import logging
+
+import src.jobs.tasks
+from src.jobs.queue import run_workers
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_workers())
@@ -0,0 +1,110 @@
+"""Loaders por requisição que agrupam buscas por chave.
+
+Todas as chamadas a load() feitas na mesma volta do event loop viram uma
+única query `WHERE coluna = ANY(:keys)`. Cada chave é buscada no máximo uma
+vez por requisição, e as queries dos loaders usam a sessão da requisição uma
+de cada vez.
+"""
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from fastapi import Depends
+from sqlalchemy import Integer, Text, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.database import get_async_session, get_read_session
+
+
+class Loader:
+    def __init__(self, fetch: Callable[[list], Awaitable[dict]], default: Callable[[], Any] = lambda: None):
+        self.fetch = fetch
+        self.default = default
+        self.cache: dict[Hashable, asyncio.Future] = {}
+        self.pending: list[Hashable] = []
+        self.tasks: set[asyncio.Task] = set()
+
+    def load(self, key: Hashable) -> asyncio.Future:
+        future = self.cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.cache[key] = loop.create_future()
+            if not self.pending:
+                loop.call_soon(self._dispatch)
+            self.pending.append(key)
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> list:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        keys, self.pending = self.pending, []
+        task = asyncio.create_task(self._resolve(keys))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _resolve(self, keys: list) -> None:
+        try:
+            found = await self.fetch(keys)
+        except Exception as error:
+            for key in keys:
+                future = self.cache.pop(key)
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for key in keys:
+            future = self.cache[key]
+            if future.done():
+                # Cancelado junto com quem esperava (ex.: gather desfeito); a próxima load() busca de novo.
+                del self.cache[key]
+            else:
+                future.set_result(found.get(key, self.default()))
+
+
+class Loaders:
+    """Loaders da requisição, criados sob demanda para cada coluna."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.lock = asyncio.Lock()
+        self._loaders: dict[tuple, Loader] = {}
+
+    def by(self, column: InstrumentedAttribute) -> Loader:
+        """Um objeto por chave (ex.: User.id). Chaves sem linha resolvem para None."""
+        key = (column, False)
+        if key not in self._loaders:
+            self._loaders[key] = Loader(lambda keys: self._fetch(column, keys, many=False))
+        return self._loaders[key]
+
+    def many_by(self, column: InstrumentedAttribute) -> Loader:
+        """Lista de objetos por chave (ex.: Event.user_id)."""
+        key = (column, True)
+        if key not in self._loaders:
+            self._loaders[key] = Loader(lambda keys: self._fetch(column, keys, many=True), default=list)
+        return self._loaders[key]
+
+    async def _fetch(self, column: InstrumentedAttribute, keys: list, many: bool) -> dict:
+        item_type = Integer if isinstance(keys[0], int) else Text
+        query = select(column.class_).where(column == any_(bindparam("keys", keys, type_=ARRAY(item_type))))
+        async with self.lock:
+            query_result = await self.session.scalars(query)
+            rows = query_result.all()
+
+        if not many:
+            return {getattr(row, column.key): row for row in rows}
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[getattr(row, column.key)].append(row)
+        return grouped
+
+
+async def get_loaders(session: AsyncSession = Depends(get_read_session)) -> Loaders:
+    """Loaders sobre a sessão de leitura, que pode estar ligada a uma réplica."""
+    return Loaders(session)
+
+
+async def get_primary_loaders(session: AsyncSession = Depends(get_async_session)) -> Loaders:
+    """Loaders sobre o primário, para rotas cuja resposta vai para o cache."""
+    return Loaders(session)
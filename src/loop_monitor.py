@@ -0,0 +1,127 @@
+"""Monitor de atraso do event loop e detector de chamadas bloqueantes.
+
+Uma task mede continuamente o atraso do loop. Uma thread watchdog percebe
+quando o loop fica parado por mais que o limite e registra a rota e a pilha
+que estavam executando. No modo estrito a requisição responsável falha com
+BlockingCallError, o que faz os testes quebrarem.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from types import FrameType
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings as s
+from src.connections import LatencyWindow
+
+
+logger = logging.getLogger(__name__)
+
+
+class BlockingCallError(RuntimeError):
+    pass
+
+
+def find_scope(frame: Optional[FrameType]) -> Optional[dict]:
+    while frame is not None:
+        scope = frame.f_locals.get("scope")
+        if isinstance(scope, dict) and "path" in scope:
+            return scope
+        frame = frame.f_back
+    return None
+
+
+def route_name(scope: Optional[dict]) -> str:
+    if scope is None:
+        return "<fora de uma requisição>"
+    route = scope.get("route")
+    return f"{scope.get('method', 'WS')} {getattr(route, 'path', scope['path'])}"
+
+
+class LoopMonitor:
+    def __init__(self, interval: float = s.loop_monitor_interval, threshold: float = s.loop_block_threshold, strict: bool = s.loop_monitor_strict):
+        self.interval = interval
+        self.threshold = threshold
+        self.strict = strict
+        self.lag = LatencyWindow()
+        self.blocked_calls = 0
+        self.violations: deque[dict] = deque(maxlen=100)
+        self._blocking_scopes: set[int] = set()
+        self._heartbeat = time.monotonic()
+        self._reported = False
+        self._loop_thread: Optional[int] = None
+        self._stopped = threading.Event()
+
+    async def run(self) -> None:
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        watchdog.start()
+        try:
+            while True:
+                self._heartbeat = time.monotonic()
+                self._reported = False
+                await asyncio.sleep(self.interval)
+                self.lag.observe(max(0.0, time.monotonic() - self._heartbeat - self.interval))
+        finally:
+            self._stopped.set()
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval / 2):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled <= self.threshold or self._reported:
+                continue
+            self._reported = True
+            frame = sys._current_frames().get(self._loop_thread)
+            scope = find_scope(frame)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            self.blocked_calls += 1
+            self.violations.append({"route": route_name(scope), "stalled_ms": stalled * 1000, "stack": stack})
+            if scope is not None:
+                self._blocking_scopes.add(id(scope))
+            logger.warning("Event loop bloqueado há %.0f ms em %s\n%s", stalled * 1000, route_name(scope), stack)
+
+    def check_scope(self, scope: dict) -> None:
+        if id(scope) in self._blocking_scopes:
+            self._blocking_scopes.discard(id(scope))
+            if self.strict:
+                raise BlockingCallError(f"{route_name(scope)} bloqueou o event loop")
+
+    def middleware(self, app: ASGIApp) -> ASGIApp:
+        """Middleware ASGI puro que faz a requisição falhar no modo estrito.
+
+        Um bloqueio antes dos headers vira erro 500; um bloqueio durante o
+        corpo de um StreamingResponse só aparece quando a resposta termina.
+        """
+        async def monitored(scope: Scope, receive: Receive, send: Send) -> None:
+            if scope["type"] != "http":
+                await app(scope, receive, send)
+                return
+
+            async def checked_send(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    self.check_scope(scope)
+                await send(message)
+
+            try:
+                await app(scope, receive, checked_send)
+            finally:
+                self.check_scope(scope)
+
+        return monitored
+
+    def assert_no_blocking(self) -> None:
+        if self.violations:
+            raise BlockingCallError(f"{len(self.violations)} chamadas bloquearam o event loop: {self.violations[0]['route']}")
+
+    def stats(self) -> dict:
+        return {"lag": self.lag.stats(), "blocked_calls": self.blocked_calls, "threshold_ms": self.threshold * 1000}
+
+
+monitor = LoopMonitor()
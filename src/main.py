@@ -1,58 +1,150 @@
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 
-from fastapi_cache.backends.redis import RedisBackend
 from fastapi_cache import FastAPICache
-from fastapi_cache.decorator import cache
-from redis import asyncio as aioredis
-import time
+import asyncio
 
 from src.users.router import router as user_router
 from src.reservations.router import router as reservation_router
 from src.events.router import router as events_router
 from src.comments.router import router as comments_router
+from src.jobs.router import router as jobs_router
 
 from src.config import settings
+from src.database import engine, replica_engines, get_pool_stats, ReadYourWritesMiddleware
+from src.connections import ConnectionManager, publish, run_subscriber
+from src.events.availability import hub, run_availability_subscriber
+from src.security import token_cache
+from src.users.router import user_cache
+from src.cache import backend, CacheCoder, PREFIX
+from src.loop_monitor import monitor
+from src.metrics import Gauge, instrument_app, instrument_engine, registry, render_metrics
+from src.jobs.queue import enqueue_once, run_workers
+import src.jobs.tasks
+from src.reservations.inventory import load_inventories, run_flusher
+from src.events.upcoming import run_upcoming_refresher
 
 
 app = FastAPI(
     title=settings.app_name,
 )
 
+app.add_middleware(monitor.middleware)
+instrument_app(app)
+instrument_engine(engine)
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine)
+if settings.db_read_your_writes_window > 0:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 app.include_router(user_router)
 app.include_router(reservation_router)
 app.include_router(events_router)
 app.include_router(comments_router)
+app.include_router(jobs_router)
+
+background_tasks = set()
 
 @app.on_event("startup")
 async def startup():
-    redis = aioredis.from_url(f"redis://{settings.redis_host}:{settings.redis_port}")
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    FastAPICache.init(backend, prefix=PREFIX, coder=CacheCoder)
+    background_tasks.add(asyncio.create_task(monitor.run()))
+    await load_inventories()
+    background_tasks.add(asyncio.create_task(run_flusher()))
+    background_tasks.add(asyncio.create_task(run_subscriber(manager)))
+    background_tasks.add(asyncio.create_task(run_availability_subscriber()))
+    background_tasks.add(asyncio.create_task(run_upcoming_refresher()))
+    if settings.jobs_in_process:
+        background_tasks.add(asyncio.create_task(run_workers()))
+
 
+@app.on_event("shutdown")
+async def shutdown():
+    for task in background_tasks:
+        task.cancel()
 
-@app.get("/long_operation")
-@cache(expire=60)
+
+@app.get("/long_operation", status_code=202)
 async def long_op():
-    time.sleep(3)
-    return {"operation": "longo"}
+    job_id = await enqueue_once("long_operation")
+    return {"job_id": job_id}
+
+
+@app.get("/pool_stats")
+async def pool_stats():
+    return {**get_pool_stats(), "replicas": [get_pool_stats(replica_engine) for replica_engine in replica_engines]}
+
+
+@app.get("/loop_stats")
+async def loop_stats():
+    return monitor.stats()
+
+
+@app.get("/cache_stats")
+async def cache_stats():
+    return backend.hit_ratio()
+
+
+@app.get("/auth_cache_stats")
+async def auth_cache_stats():
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
 
 
-connected_users = set()
+manager = ConnectionManager()
+
+registry.extend([
+    Gauge("db_pool_connections", "Conexões do pool por estado.",
+          lambda: {(state,): value for state, value in get_pool_stats().items()}, ("state",)),
+    Gauge("event_loop_lag_p99_seconds", "p99 do atraso do event loop.",
+          lambda: {(): monitor.lag.stats()["p99_ms"] / 1000}),
+    Gauge("event_loop_blocked_calls", "Chamadas que bloquearam o event loop.",
+          lambda: {(): monitor.blocked_calls}),
+    Gauge("cache_requests", "Acertos e falhas do cache por namespace.",
+          lambda: {(namespace, result): counts[result] for namespace, counts in backend.stats.items() for result in ("hits", "misses")},
+          ("namespace", "result")),
+    Gauge("ws_connections", "Websockets conectados.", lambda: {(): len(manager.connections)}),
+    Gauge("ws_dropped_messages", "Mensagens descartadas por clientes lentos.", lambda: {(): manager.dropped_messages}),
+])
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
-    connected_users.add(websocket)
+    await manager.connect(websocket)
 
     try:
         while True:
             data = await websocket.receive_text()
-            await websocket.send_text("Enviando mensagem: "+ data)
-    except:
-        connected_users.remove(websocket)
+            manager.send_text(websocket, "Enviando mensagem: "+ data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(websocket)
+
+
+@app.websocket("/ws/events/{event_id}")
+async def event_availability_endpoint(websocket: WebSocket, event_id: int):
+    await hub.connect(event_id, websocket)
+
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.disconnect(event_id, websocket)
 
 
 @app.post("/send_message_to_all_websocket_users")
 async def send_message_to_all_websocket_users(payload: dict):
-    for user in connected_users:
-        await user.send_json(payload)
-    return {"message": "ok"}
\ No newline at end of file
+    await publish(payload)
+    return {"message": "ok"}
+
+
+@app.get("/ws_stats")
+async def ws_stats():
+    return manager.stats()
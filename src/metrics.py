@@ -0,0 +1,190 @@
+"""Métricas da app no formato texto do Prometheus.
+
+O middleware ASGI registra a latência e o status de cada rota, e os eventos
+before/after_cursor_execute do SQLAlchemy somam a quantidade de queries e o
+tempo de banco da requisição atual.
+"""
+import bisect
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+
+from fastapi import FastAPI
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import settings as s
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    labels = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values: dict[tuple, float] = defaultdict(float)
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        self.values[label_values] += amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for label_values, value in self.values.items():
+            yield f"{self.name}{format_labels(self.labels, label_values)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self.counts: dict[tuple, list[int]] = {}
+        self.sums: dict[tuple, float] = defaultdict(float)
+
+    def observe(self, value: float, *label_values) -> None:
+        counts = self.counts.setdefault(label_values, [0] * (len(self.buckets) + 1))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[label_values] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{format_labels(self.labels, label_values, le)} {cumulative}"
+            yield f"{self.name}_sum{format_labels(self.labels, label_values)} {self.sums[label_values]}"
+            yield f"{self.name}_count{format_labels(self.labels, label_values)} {cumulative}"
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, collect: Callable[[], dict[tuple, float]], labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.collect = collect
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        for label_values, value in self.collect().items():
+            yield f"{self.name}{format_labels(self.labels, label_values)} {value}"
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Latência das requisições HTTP.", ("method", "route"))
+REQUESTS = Counter("http_requests_total", "Requisições HTTP por status.", ("method", "route", "status"))
+REQUEST_QUERIES = Histogram("http_request_db_queries", "Queries SQL por requisição.", ("method", "route"), QUERY_BUCKETS)
+REQUEST_DB_TIME = Histogram("http_request_db_duration_seconds", "Tempo de banco por requisição.", ("method", "route"))
+QUERY_LATENCY = Histogram("db_query_duration_seconds", "Latência de cada query SQL.")
+
+registry: list = [REQUEST_LATENCY, REQUESTS, REQUEST_QUERIES, REQUEST_DB_TIME, QUERY_LATENCY]
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in registry for line in metric.render()) + "\n"
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        QUERY_LATENCY.observe(elapsed)
+        stats = request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+
+
+def route_template(scope: dict) -> str:
+    """Path declarado da rota (ex.: /events/{event_id}), para não criar uma série por id."""
+    app = scope["app"]
+    templates = app.state.route_templates = getattr(app.state, "route_templates", None) or {
+        route.endpoint: route.path for route in app.routes if hasattr(route, "endpoint")
+    }
+    return templates.get(scope.get("endpoint"), "unmatched")
+
+
+class MetricsMiddleware:
+    """Middleware ASGI puro: não cria uma task nem um stream por requisição como o BaseHTTPMiddleware.
+
+    As métricas são registradas quando o último pedaço do corpo é enviado, para
+    que as queries feitas durante um StreamingResponse entrem na conta. O
+    Server-Timing vai nos headers, então só cobre o tempo até eles.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            recorded = True
+            method, route = scope["method"], route_template(scope)
+            REQUEST_LATENCY.observe(time.perf_counter() - start, method, route)
+            REQUESTS.inc(method, route, status)
+            REQUEST_QUERIES.observe(stats.queries, method, route)
+            REQUEST_DB_TIME.observe(stats.db_time, method, route)
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if s.server_timing:
+                    elapsed = time.perf_counter() - start
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing",
+                        f'app;dur={elapsed * 1000:.1f}, db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+                    )
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            if not recorded:
+                record()
+            request_stats.reset(token)
+
+
+def instrument_app(app: FastAPI) -> None:
+    app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,142 @@
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Generic, List, Optional, Type, TypeVar
+
+from fastapi import HTTPException, Query
+from sqlalchemy import ColumnElement, Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings as s
+from src.schemas import CustomBase
+from src.serialization import RawJSONResponse, dump_json
+
+
+T = TypeVar("T")
+
+
+class Page(CustomBase, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class PageParams:
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None),
+        limit: int = Query(s.page_default_limit, ge=1, le=s.page_max_limit),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def fields_param(schema: Type[CustomBase]) -> Callable[..., Optional[List[str]]]:
+    """Dependência do parâmetro ?fields=a,b que valida os campos contra o schema de resposta."""
+    def dependency(fields: Optional[str] = Query(None, examples=["id,username"])) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        invalid = [name for name in names if name not in schema.model_fields]
+        if not names:
+            raise HTTPException(status_code=400, detail="Nenhum campo informado")
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Campos inválidos: {', '.join(invalid)}")
+        return names
+    return dependency
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    return _encode([created_at.isoformat(), id])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def encode_rank_cursor(rank: float, id: int) -> str:
+    return _encode([rank, id])
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, id = _decode(cursor)
+        return float(rank), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+
+def keyset(query: Select, model, params: PageParams) -> Select:
+    """Ordena por (created_at, id) decrescente e aplica o cursor da página anterior."""
+    if params.cursor is not None:
+        query = query.where(tuple_(model.created_at, model.id) < decode_cursor(params.cursor))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(params.limit + 1)
+
+
+def make_page(rows: list, params: PageParams) -> dict:
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def fast_path(schema: Optional[Type[CustomBase]]) -> bool:
+    return schema is not None and s.fast_serialization != "off"
+
+
+def page_response(page: dict, schema: Optional[Type[CustomBase]] = None) -> RawJSONResponse:
+    """Serializa a página de dicts; com schema e FAST_SERIALIZATION=validate ela é validada em lote antes."""
+    validate = schema is not None and s.fast_serialization == "validate"
+    return RawJSONResponse(dump_json(page, Page[schema] if validate else None))
+
+
+async def paginate(session: AsyncSession, query: Select, model, params: PageParams, fields: Optional[List[str]] = None, schema: Optional[Type[CustomBase]] = None):
+    """Página de objetos do ORM, ou, com ?fields= ou o caminho rápido ligado, de tuplas já serializadas."""
+    if fields is None and not fast_path(schema):
+        query_result = await session.scalars(keyset(query, model, params))
+        return make_page(query_result.unique().all(), params)
+
+    names = fields or list(schema.model_fields)
+    columns = dict.fromkeys([*names, "created_at", "id"])
+    query = query.with_only_columns(*(getattr(model, column) for column in columns))
+    query_result = await session.execute(keyset(query, model, params))
+    page = make_page(query_result.all(), params)
+    page["items"] = [{name: row._mapping[name] for name in names} for row in page["items"]]
+    return page_response(page, schema if fields is None else None)
+
+def ranked(query: Select, rank: ColumnElement, model, params: PageParams) -> Select:
+    """Ordena por (rank, id) decrescente e aplica o cursor da página anterior."""
+    if params.cursor is not None:
+        query = query.where(tuple_(rank, model.id) < decode_rank_cursor(params.cursor))
+    return query.order_by(rank.desc(), model.id.desc()).limit(params.limit + 1)
+
+
+async def paginate_ranked(session: AsyncSession, query: Select, rank: ColumnElement, model, params: PageParams, schema: Optional[Type[CustomBase]] = None):
+    """Como paginate, mas para buscas ordenadas por relevância."""
+    fast = fast_path(schema)
+    if fast:
+        query = query.with_only_columns(*(getattr(model, name) for name in schema.model_fields))
+    query_result = await session.execute(ranked(query.add_columns(rank.label("rank")), rank, model, params))
+    rows = query_result.all()
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = encode_rank_cursor(rows[-1].rank, rows[-1].id if fast else rows[-1][0].id)
+
+    if not fast:
+        return {"items": [row[0] for row in rows], "next_cursor": next_cursor}
+    items = [{name: row._mapping[name] for name in schema.model_fields} for row in rows]
+    return page_response({"items": items, "next_cursor": next_cursor}, schema)
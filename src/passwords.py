@@ -0,0 +1,22 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from src.config import settings as s
+
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=s.bcrypt_rounds)
+
+# O bcrypt libera o GIL, então threads bastam para tirar o hash do event loop.
+executor = ThreadPoolExecutor(max_workers=s.password_hash_workers, thread_name_prefix="password")
+
+
+async def hash_password(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, pwd_context.verify, password, hashed_password)
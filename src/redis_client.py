@@ -0,0 +1,6 @@
+from redis import asyncio as aioredis
+
+from src.config import settings as s
+
+
+redis = aioredis.from_url(f"redis://{s.redis_host}:{s.redis_port}")
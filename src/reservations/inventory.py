@@ -0,0 +1,273 @@
+"""Estoque de lugares em Redis para eventos em modo flash sale.
+
+As reservas são seguradas (hold) atomicamente no Redis e gravadas em lote
+na tabela de reservas por um flusher em segundo plano.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Iterable, Optional
+
+from redis.exceptions import LockError
+from sqlalchemy import select
+
+from src.batch import existing_ids, insert_many
+from src.cache import invalidate_events
+from src.config import settings as s
+from src.database import async_session_maker
+# Import do módulo, e não dos nomes, porque availability também importa este módulo.
+from src.events import availability
+from src.events.models import Event
+from src.redis_client import redis
+from src.reservations.models import Reservation
+from src.reservations.seats import reserve_seats
+from src.users.models import User
+
+
+logger = logging.getLogger(__name__)
+
+EVENTS_KEY = "inventory:events"
+LOCK_KEY = "inventory:lock"
+
+HOLD_SCRIPT = redis.register_script("""
+local available = redis.call('GET', KEYS[1])
+if not available then
+    return -2
+end
+local num_guests = tonumber(ARGV[1])
+if tonumber(available) < num_guests then
+    return -1
+end
+redis.call('RPUSH', KEYS[2], ARGV[2])
+redis.call('SET', KEYS[3], ARGV[3], 'EX', ARGV[4])
+return redis.call('DECRBY', KEYS[1], num_guests)
+""")
+
+RELEASE_SCRIPT = redis.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+return redis.call('INCRBY', KEYS[1], ARGV[1])
+""")
+
+RECONCILE_SCRIPT = redis.register_script("""
+if redis.call('EXISTS', KEYS[1]) == 0 or redis.call('LLEN', KEYS[2]) > 0 then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1])
+return 1
+""")
+
+
+class SoldOut(Exception):
+    pass
+
+
+def available_key(event_id: int) -> str:
+    return f"inventory:{event_id}:available"
+
+
+def pending_key(event_id: int) -> str:
+    return f"inventory:{event_id}:pending"
+
+
+def hold_key(hold_id: str) -> str:
+    return f"inventory:hold:{hold_id}"
+
+
+async def hold_seats(event_id: int, user_id: int, num_guests: int) -> Optional[dict]:
+    """Segura os lugares no Redis.
+
+    Retorna o hold criado, None se o evento não está em flash sale, ou
+    levanta SoldOut se não há lugares suficientes.
+    """
+    hold = {"hold_id": uuid.uuid4().hex, "event_id": event_id, "user_id": user_id, "num_guests": num_guests}
+    status = json.dumps({**hold, "status": "pending"})
+    result = await HOLD_SCRIPT(
+        keys=[available_key(event_id), pending_key(event_id), hold_key(hold["hold_id"])],
+        args=[num_guests, json.dumps(hold), status, s.inventory_hold_ttl],
+    )
+    if result == -2:
+        return None
+    if result == -1:
+        raise SoldOut()
+    return {**hold, "status": "pending"}
+
+
+async def flash_sale_events(event_ids: Iterable[int]) -> set[int]:
+    """Eventos com estoque aberto no Redis, cujas reservas precisam passar por hold_seats."""
+    event_ids = list(event_ids)
+    async with redis.pipeline(transaction=False) as pipe:
+        for event_id in event_ids:
+            pipe.exists(available_key(event_id))
+        found = await pipe.execute()
+    return {event_id for event_id, exists in zip(event_ids, found) if exists}
+
+
+async def return_seats(event_id: int, num_guests: int) -> None:
+    """Devolve ao estoque do Redis lugares liberados no banco, se o evento está em flash sale."""
+    await RELEASE_SCRIPT(keys=[available_key(event_id)], args=[num_guests])
+
+
+async def adjust_capacity(event_id: int, delta: int) -> None:
+    """Aplica ao estoque do Redis uma mudança de Event.capacity, se o evento está em flash sale.
+
+    reconcile_event não serve aqui porque só roda com a fila de holds vazia.
+    """
+    if delta:
+        await RELEASE_SCRIPT(keys=[available_key(event_id)], args=[delta])
+
+
+async def remaining_seats(event_id: int, capacity: int, reserved_seats: int) -> int:
+    """Lugares livres do evento. Em flash sale o estoque do Redis está à frente do banco."""
+    available = await redis.get(available_key(event_id))
+    if available is None:
+        return capacity - reserved_seats
+    return int(available)
+
+
+async def get_hold(hold_id: str) -> Optional[dict]:
+    value = await redis.get(hold_key(hold_id))
+    if value is None:
+        return None
+    return json.loads(value)
+
+
+async def open_inventory(event: Event) -> None:
+    """Abre o estoque do evento. event deve ter sido lido depois do commit que ligou o flash sale."""
+    await redis.set(available_key(event.id), event.capacity - event.reserved_seats, nx=True)
+    await redis.sadd(EVENTS_KEY, event.id)
+
+
+async def close_inventory(event_id: int) -> None:
+    """Desliga o modo flash sale e grava os holds que ainda estão pendentes."""
+    async with redis.lock(LOCK_KEY, timeout=60):
+        await redis.delete(available_key(event_id))
+        while await flush_event(event_id):
+            pass
+        await redis.srem(EVENTS_KEY, event_id)
+
+
+async def load_inventories() -> None:
+    async with async_session_maker() as session:
+        query_result = await session.scalars(select(Event).where(Event.flash_sale.is_(True)))
+        for event in query_result.all():
+            await open_inventory(event)
+
+
+async def flush_event(event_id: int) -> int:
+    """Grava um lote de holds pendentes do evento. Precisa ser chamada com LOCK_KEY.
+
+    O hold_id é gravado na reserva com unique, então um lote que já foi
+    commitado mas não saiu da fila (queda entre o commit e o LTRIM) não é
+    gravado de novo. Holds de usuários que não existem são rejeitados e seus
+    lugares voltam para o estoque, em vez de travar a fila do evento.
+    """
+    raw_holds = await redis.lrange(pending_key(event_id), 0, s.inventory_flush_batch - 1)
+    if not raw_holds:
+        return 0
+
+    holds = [json.loads(raw) for raw in raw_holds]
+    new, rejected, invalid = [], [], []
+
+    async with async_session_maker() as session:
+        query = select(Reservation.hold_id, Reservation.id).where(Reservation.hold_id.in_([hold["hold_id"] for hold in holds]))
+        query_result = await session.execute(query)
+        confirmed = dict(query_result.all())
+        users = await existing_ids(session, User.id, (hold["user_id"] for hold in holds))
+
+        for hold in holds:
+            if hold["hold_id"] in confirmed:
+                continue
+            if hold["user_id"] in users:
+                new.append(hold)
+            else:
+                invalid.append(hold)
+
+        accepted = []
+        if new and await reserve_seats(session, event_id, sum(hold["num_guests"] for hold in new)) is not None:
+            accepted = new
+        else:
+            for hold in new:
+                if await reserve_seats(session, event_id, hold["num_guests"]) is not None:
+                    accepted.append(hold)
+                else:
+                    rejected.append(hold)
+
+        reservation_ids = await insert_many(session, Reservation, [
+            {"num_guests": hold["num_guests"], "user_id": hold["user_id"], "event_id": event_id, "hold_id": hold["hold_id"]}
+            for hold in accepted
+        ])
+        await session.commit()
+        await invalidate_events(session, [event_id])
+
+    confirmed.update(zip((hold["hold_id"] for hold in accepted), reservation_ids))
+
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.ltrim(pending_key(event_id), len(raw_holds), -1)
+        for hold in holds:
+            if hold["hold_id"] in confirmed:
+                status = {**hold, "status": "confirmed", "reservation_id": confirmed[hold["hold_id"]]}
+                pipe.set(hold_key(hold["hold_id"]), json.dumps(status), ex=s.inventory_hold_ttl)
+        for hold in rejected:
+            pipe.set(hold_key(hold["hold_id"]), json.dumps({**hold, "status": "rejected"}), ex=s.inventory_hold_ttl)
+        for hold in invalid:
+            status = {**hold, "status": "rejected", "detail": "Usuário não encontrado"}
+            pipe.set(hold_key(hold["hold_id"]), json.dumps(status), ex=s.inventory_hold_ttl)
+        await pipe.execute()
+
+    if invalid:
+        await return_seats(event_id, sum(hold["num_guests"] for hold in invalid))
+        await availability.publish_availability(event_id)
+    if rejected or invalid:
+        logger.warning("Evento %s: %s holds rejeitados na gravação", event_id, len(rejected) + len(invalid))
+    return len(raw_holds)
+
+
+async def reconcile_event(event_id: int) -> bool:
+    """Alinha o estoque do Redis com Event.capacity. Precisa ser chamada com LOCK_KEY."""
+    async with async_session_maker() as session:
+        query = select(Event.capacity - Event.reserved_seats).where(Event.id == event_id)
+        query_result = await session.scalars(query)
+        available = query_result.first()
+
+    if available is None:
+        await redis.delete(available_key(event_id))
+        await redis.srem(EVENTS_KEY, event_id)
+        return False
+    return bool(await RECONCILE_SCRIPT(keys=[available_key(event_id), pending_key(event_id)], args=[available]))
+
+
+async def run_flusher() -> None:
+    last_reconcile = time.monotonic()
+    while True:
+        await asyncio.sleep(s.inventory_flush_interval)
+        lock = redis.lock(LOCK_KEY, timeout=60)
+        acquired = False
+        try:
+            acquired = await lock.acquire(blocking=False)
+            if not acquired:
+                continue
+            reconcile = time.monotonic() - last_reconcile >= s.inventory_reconcile_interval
+            for member in await redis.smembers(EVENTS_KEY):
+                event_id = int(member)
+                await flush_event(event_id)
+                if reconcile:
+                    await reconcile_event(event_id)
+            if reconcile:
+                last_reconcile = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Falha ao gravar os holds do estoque")
+            await asyncio.sleep(1)
+        finally:
+            if acquired:
+                try:
+                    await lock.release()
+                except LockError:
+                    logger.warning("Lock do estoque expirou antes do fim da gravação")
+                except Exception:
+                    logger.exception("Falha ao liberar o lock do estoque")
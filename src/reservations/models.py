@@ -1,19 +1,25 @@
-from sqlalchemy import Integer, Text, ForeignKey, DateTime, func
+from sqlalchemy import Integer, String, Text, ForeignKey, DateTime, func, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import JSONB
 
 from datetime import datetime
+from typing import Optional
 from src.database import Base
 
 
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        Index("ix_reservations_created_at_id", "created_at", "id"),
+        Index("ix_reservations_event_id_created_at_id", "event_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     num_guests: Mapped[int] = mapped_column(Integer)
-    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE", onupdate="CASCADE"))
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"))
+    event_id: Mapped[int] = mapped_column(ForeignKey("events.id", ondelete="CASCADE", onupdate="CASCADE"), index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"), index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    hold_id: Mapped[Optional[str]] = mapped_column(String(32), unique=True, index=True, nullable=True)
 
-    user: Mapped["User"] = relationship(back_populates="reservations")
-    event: Mapped["Event"] = relationship(back_populates="reservations")
\ No newline at end of file
+    user: Mapped["User"] = relationship(back_populates="reservations", lazy="raise")
+    event: Mapped["Event"] = relationship(back_populates="reservations", lazy="raise")
\ No newline at end of file
@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional, Union
+from collections import defaultdict
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from src.database import get_async_session
+from src.database import get_async_session, get_read_session
+from src.loaders import Loaders, get_loaders
 from src.reservations.models import Reservation
 from src.events.models import Event
-from src.reservations.schemas import ReservationResponse, ReservationCreate, ReservationUpdate
+from src.users.models import User
+from src.reservations.seats import reserve_seats, release_seats, event_exists
+from src.reservations.schemas import ReservationResponse, ReservationCreate, ReservationUpdate, ReservationHold
+from src.reservations.inventory import hold_seats, get_hold, flash_sale_events, return_seats, SoldOut
+from src.events.availability import publish_availability
+from src.cache import invalidate_events
+from src.pagination import Page, PageParams, paginate, fields_param
+from src.export import ndjson_response
+from src.batch import check_batch_size, existing_ids, insert_many, batch_response
+from src.schemas import BatchItemResult, BatchResponse
 from sqlalchemy import select
 
 router = APIRouter(
@@ -14,41 +25,56 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=List[ReservationResponse])
-async def get_events(session: AsyncSession = Depends(get_async_session)):
+@router.get("/", response_model=Page[ReservationResponse])
+async def get_events(event_id: Optional[int] = Query(None), page: PageParams = Depends(), fields: Optional[List[str]] = Depends(fields_param(ReservationResponse)), session: AsyncSession = Depends(get_read_session)):
     query = select(Reservation)
-    query_result = await session.scalars(query)
-    result = query_result.all()
+    if event_id is not None:
+        query = query.where(Reservation.event_id == event_id)
+    return await paginate(session, query, Reservation, page, fields, ReservationResponse)
 
-    return result
+
+@router.get("/export")
+async def export_reservations():
+    query = select(Reservation).order_by(Reservation.id)
+    return ndjson_response(query, ReservationResponse)
 
 
 @router.get("/{reservation_id}", response_model=ReservationResponse)
-async def get_event(reservation_id: int, session: AsyncSession = Depends(get_async_session)):
-    query = select(Reservation).where(Reservation.id == reservation_id)
-    query_result = await session.scalars(query)
-    result = query_result.first()
+async def get_event(reservation_id: int, loaders: Loaders = Depends(get_loaders)):
+    result = await loaders.by(Reservation.id).load(reservation_id)
 
     if result is None:
         raise HTTPException(status_code=404, detail="Reserva não foi encontrada")
     
     return result
 
-@router.post("/", response_model=ReservationResponse)
-async def create_event(payload: ReservationCreate, session: AsyncSession = Depends(get_async_session)):
-    query = select(Event.capacity).where(Event.id == payload.event_id)
-    query_result = await session.scalars(query)
-    max_capacity = query_result.first()
+@router.get("/holds/{hold_id}", response_model=ReservationHold)
+async def get_reservation_hold(hold_id: str):
+    result = await get_hold(hold_id)
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Reserva não foi encontrada")
+
+    return result
 
-    if not max_capacity:
-        raise HTTPException(status_code=404, detail="Evento não encontrado")
-    
-    query = select(Reservation.num_guests).where(Reservation.event_id == payload.event_id)
-    query_result = await session.scalars(query)
-    num_guests_array = query_result.all()
-    num_guest = sum(num_guests_array)
 
-    if num_guest + payload.num_guests > max_capacity:
+@router.post("/", response_model=Union[ReservationResponse, ReservationHold])
+async def create_event(payload: ReservationCreate, response: Response, session: AsyncSession = Depends(get_async_session)):
+    try:
+        hold = await hold_seats(payload.event_id, payload.user_id, payload.num_guests)
+    except SoldOut:
+        raise HTTPException(status_code=400, detail="Reservas esgotadas")
+
+    if hold is not None:
+        response.status_code = 202
+        await publish_availability(payload.event_id)
+        return hold
+
+    reserved = await reserve_seats(session, payload.event_id, payload.num_guests)
+
+    if reserved is None:
+        if not await event_exists(session, payload.event_id):
+            raise HTTPException(status_code=404, detail="Evento não encontrado")
         raise HTTPException(status_code=400, detail="Reservas esgotadas")
     
     new_reservation = Reservation(
@@ -63,16 +89,76 @@ async def create_event(payload: ReservationCreate, session: AsyncSession = Depen
         await session.commit()
     except IntegrityError:
         raise HTTPException(status_code=400, detail="Reserva já foi cadastrada") 
+    await invalidate_events(session, [payload.event_id])
+    await publish_availability(payload.event_id)
     return new_reservation
 
+@router.post("/batch", response_model=BatchResponse)
+async def create_reservations_batch(payload: List[ReservationCreate], session: AsyncSession = Depends(get_async_session)):
+    check_batch_size(payload)
+    users = await existing_ids(session, User.id, (item.user_id for item in payload))
+    events = await existing_ids(session, Event.id, (item.event_id for item in payload))
+
+    flash_sale = await flash_sale_events(events)
+
+    failures, by_event = {}, defaultdict(list)
+    for index, item in enumerate(payload):
+        if item.user_id not in users:
+            failures[index] = BatchItemResult(index=index, status_code=404, detail="Usuário não encontrado")
+        elif item.event_id not in events:
+            failures[index] = BatchItemResult(index=index, status_code=404, detail="Evento não encontrado")
+        elif item.event_id in flash_sale:
+            failures[index] = BatchItemResult(index=index, status_code=409, detail="Evento em flash sale: reserve pelo POST /reservations/")
+        else:
+            by_event[item.event_id].append(index)
+
+    indexes = []
+    for event_id, event_indexes in sorted(by_event.items()):
+        if await reserve_seats(session, event_id, sum(payload[index].num_guests for index in event_indexes)) is not None:
+            indexes.extend(event_indexes)
+            continue
+        for index in event_indexes:
+            if await reserve_seats(session, event_id, payload[index].num_guests) is not None:
+                indexes.append(index)
+            else:
+                failures[index] = BatchItemResult(index=index, status_code=400, detail="Reservas esgotadas")
+
+    ids = await insert_many(session, Reservation, [payload[index].model_dump() for index in indexes])
+
+    try:
+        await session.commit()
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Reserva já foi cadastrada")
+    await invalidate_events(session, by_event)
+    await publish_availability(*by_event)
+    return batch_response(failures, indexes, ids)
+
 @router.patch("/{reservation_id}", response_model=ReservationResponse)
 async def update_event(reservation_id: int, payload: ReservationUpdate, session: AsyncSession = Depends(get_async_session)):
-    query = select(Reservation).where(Reservation.id == reservation_id)
+    query = select(Reservation).where(Reservation.id == reservation_id).with_for_update()
     query_result = await session.scalars(query)
     result = query_result.first()
 
     if result is None:
         raise HTTPException(status_code=404, detail="Reserva não foi encontrada")
+
+    previous_event_id = result.event_id
+    previous_num_guests = result.num_guests
+    event_id = payload.event_id or result.event_id
+    num_guests = payload.num_guests or result.num_guests
+
+    if event_id == result.event_id and num_guests < result.num_guests:
+        await release_seats(session, event_id, result.num_guests - num_guests)
+    elif event_id != result.event_id or num_guests > result.num_guests:
+        if await flash_sale_events([event_id]):
+            raise HTTPException(status_code=409, detail="Evento em flash sale: reserve pelo POST /reservations/")
+        extra_guests = num_guests - result.num_guests if event_id == result.event_id else num_guests
+        if await reserve_seats(session, event_id, extra_guests) is None:
+            if not await event_exists(session, event_id):
+                raise HTTPException(status_code=404, detail="Evento não encontrado")
+            raise HTTPException(status_code=400, detail="Reservas esgotadas")
+        if event_id != result.event_id:
+            await release_seats(session, result.event_id, result.num_guests)
     
     for field, value in payload.model_dump().items():
         if value is not None:
@@ -82,22 +168,32 @@ async def update_event(reservation_id: int, payload: ReservationUpdate, session:
         await session.commit()
     except IntegrityError:
         raise HTTPException(status_code=400, detail="Reserva já foi cadastrada")
+    if event_id != previous_event_id:
+        await return_seats(previous_event_id, previous_num_guests)
+    elif num_guests < previous_num_guests:
+        await return_seats(event_id, previous_num_guests - num_guests)
+    await invalidate_events(session, [event_id, previous_event_id])
+    await publish_availability(event_id, previous_event_id)
     return result
 
 
 @router.delete("/{reservation_id}", status_code=204)
 async def delete_event(reservation_id: int, session: AsyncSession = Depends(get_async_session)):
-    query = select(Reservation).where(Reservation.id == reservation_id)
+    query = select(Reservation).where(Reservation.id == reservation_id).with_for_update()
     query_result = await session.scalars(query)
     result = query_result.first()
 
     if result is None:
         raise HTTPException(status_code=404, detail="Reserva não foi encontrada")
     
-    session.delete(result)
+    await release_seats(session, result.event_id, result.num_guests)
+    await session.delete(result)
 
     try:
         await session.commit()
     except IntegrityError:
         raise HTTPException(status_code=400, detail="Reserva já foi cadastrada")
-    return result
\ No newline at end of file
+    await return_seats(result.event_id, result.num_guests)
+    await invalidate_events(session, [result.event_id])
+    await publish_availability(result.event_id)
+    return None
\ No newline at end of file
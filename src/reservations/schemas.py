@@ -21,4 +21,13 @@ class ReservationCreate(CustomBase):
 class ReservationUpdate(CustomBase):
     user_id: Optional[PositiveInt] = Field(None, examples=[1])
     event_id: Optional[PositiveInt] = Field(None, examples=[1])
-    num_guests: Optional[PositiveInt] = Field(None, examples=[10])
\ No newline at end of file
+    num_guests: Optional[PositiveInt] = Field(None, examples=[10])
+
+class ReservationHold(CustomBase):
+    hold_id: str
+    status: str = Field(..., examples=["pending"])
+    event_id: Optional[PositiveInt] = Field(None, examples=[1])
+    user_id: Optional[PositiveInt] = Field(None, examples=[1])
+    num_guests: Optional[PositiveInt] = Field(None, examples=[10])
+    reservation_id: Optional[PositiveInt] = Field(None, examples=[1])
+    detail: Optional[str] = Field(None, examples=["Usuário não encontrado"])
\ No newline at end of file
@@ -0,0 +1,58 @@
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.events.models import Event
+from src.reservations.models import Reservation
+
+
+async def reserve_seats(session: AsyncSession, event_id: int, num_guests: int) -> Optional[int]:
+    """Reserva os lugares com um único UPDATE condicional.
+
+    Retorna o novo total reservado, ou None se o evento não existe ou está lotado.
+    """
+    query = (
+        update(Event)
+        .where(Event.id == event_id, Event.reserved_seats + num_guests <= Event.capacity)
+        .values(reserved_seats=Event.reserved_seats + num_guests)
+        .returning(Event.reserved_seats)
+    )
+    query_result = await session.execute(query)
+    return query_result.scalar_one_or_none()
+
+
+async def release_seats(session: AsyncSession, event_id: int, num_guests: int) -> None:
+    query = (
+        update(Event)
+        .where(Event.id == event_id)
+        .values(reserved_seats=Event.reserved_seats - num_guests)
+    )
+    await session.execute(query)
+
+
+async def release_user_seats(session: AsyncSession, user_id: int) -> dict[int, int]:
+    """Libera os lugares de todas as reservas do usuário antes do cascade do banco apagá-las.
+
+    Retorna os lugares liberados por evento.
+    """
+    totals = (
+        select(Reservation.event_id, func.sum(Reservation.num_guests).label("num_guests"))
+        .where(Reservation.user_id == user_id)
+        .group_by(Reservation.event_id)
+        .subquery()
+    )
+    query = (
+        update(Event)
+        .where(Event.id == totals.c.event_id)
+        .values(reserved_seats=Event.reserved_seats - totals.c.num_guests)
+        .returning(Event.id, totals.c.num_guests)
+        .execution_options(synchronize_session=False)
+    )
+    query_result = await session.execute(query)
+    return {event_id: int(num_guests) for event_id, num_guests in query_result.all()}
+
+
+async def event_exists(session: AsyncSession, event_id: int) -> bool:
+    query_result = await session.scalars(select(Event.id).where(Event.id == event_id))
+    return query_result.first() is not None
@@ -1,4 +1,27 @@
-from pydantic import BaseModel
+from datetime import datetime, timezone
+from typing import Annotated, List, Optional
+from pydantic import AfterValidator, BaseModel
+
+
+def as_utc(value: datetime) -> datetime:
+    """Datas sem fuso são tratadas como UTC, como o banco já faz ao gravá-las."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+UTCDatetime = Annotated[datetime, AfterValidator(as_utc)]
 
 class CustomBase(BaseModel):
-    pass
\ No newline at end of file
+    pass
+
+
+class BatchItemResult(CustomBase):
+    index: int
+    status_code: int
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BatchResponse(CustomBase):
+    results: List[BatchItemResult]
\ No newline at end of file
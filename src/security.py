@@ -4,9 +4,13 @@ from fastapi import Request
 from src.config import settings as s
 from fastapi.exceptions import HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from src.lru import ExpiringLRUCache
 import jwt
 import time
 
+
+token_cache = ExpiringLRUCache(s.token_cache_size)
+
 def sign_jwt(user_id: int) -> dict[str, str]:
     expiration_time = int(time.time()) + s.access_token_expire_minutes * 60
     payload = {
@@ -20,7 +24,7 @@ def sign_jwt(user_id: int) -> dict[str, str]:
 
 def decode_jwt(token: str) -> dict:
     try:
-        return jwt.decode(token, s.secret_key.get_secret_value(), algorithms=[s.algorithm])
+        return jwt.decode(token, s.secret_key.get_secret_value(), algorithms=[s.algorithm], options={"require": ["exp"]})
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=403, detail="Token expirou")
     except jwt.InvalidTokenError:
@@ -35,6 +39,9 @@ class JWTBearer(HTTPBearer):
         credentials: HTTPAuthorizationCredentials = await super().__call__(request)
         if not credentials or not credentials.scheme == "Bearer":
             raise HTTPException(status_code=403, detail="Não autorizado")
-        decoded_token = decode_jwt(credentials.credentials)
+        decoded_token = token_cache.get(credentials.credentials)
+        if decoded_token is None:
+            decoded_token = decode_jwt(credentials.credentials)
+            token_cache.set(credentials.credentials, decoded_token, decoded_token["exp"])
 
         return decoded_token.get("user_id")
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""Caminho rápido de serialização para as listas.
+
+As rotas buscam tuplas com as colunas do schema em vez de objetos do ORM, e
+a página é gerada direto em bytes: validada em lote por um TypeAdapter, ou,
+no modo "trusted", codificada pelo orjson sem validação, já que as linhas
+vêm do nosso próprio banco.
+"""
+from functools import lru_cache
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+class RawJSONResponse(JSONResponse):
+    """JSONResponse cujo conteúdo já chega serializado em bytes."""
+
+    def render(self, content: bytes) -> bytes:
+        return content
+
+
+@lru_cache(maxsize=None)
+def type_adapter(type_: Any) -> TypeAdapter:
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        # Modelos genéricos como Page[EventResponse] só ficam completos no primeiro uso.
+        type_.model_rebuild()
+    return TypeAdapter(type_)
+
+
+def dump_json(content: Any, type_: Optional[Any] = None) -> bytes:
+    """Valida content contra type_ e serializa pelo pydantic-core, ou só codifica com orjson se type_ for None."""
+    if type_ is None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    adapter = type_adapter(type_)
+    return adapter.dump_json(adapter.validate_python(content))
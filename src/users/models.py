@@ -1,16 +1,14 @@
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, Text, Boolean, DateTime, func
+from sqlalchemy import Integer, Text, Boolean, DateTime, func, Index
 from typing import List
 from datetime import datetime
-from passlib.context import CryptContext
 
 from src.database import Base
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     username: Mapped[str] = mapped_column(Text, unique=True)
@@ -19,18 +17,6 @@ class User(Base):
     is_admin: Mapped[bool] = mapped_column(Boolean, deferred=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
-    events: Mapped[List["Event"]] = relationship(back_populates="user", cascade="all, delete-orphan", lazy="joined")
-    reservations: Mapped[List["Reservation"]] = relationship(back_populates="user", cascade="all, delete-orphan")
-    comments: Mapped[List["Comment"]] = relationship(back_populates="user", cascade="all, delete-orphan")
-    
-
-    @property
-    def password_setter(self):
-        raise AttributeError("Senha não pode ser lida")
-    
-    @password_setter.setter
-    def password_setter(self, password: str) -> None:
-        self.password = pwd_context.hash(password)
-    
-    def check_password(self, plane_password: str) -> bool:
-        return pwd_context.verify(plane_password, self.password)
\ No newline at end of file
+    events: Mapped[List["Event"]] = relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+    reservations: Mapped[List["Reservation"]] = relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
+    comments: Mapped[List["Comment"]] = relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True, lazy="raise")
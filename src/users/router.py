@@ -2,46 +2,63 @@ from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from src.database import get_async_session
+from src.database import get_async_session, get_read_session
 from src.users.models import User
 from src.users.schemas import UserResponse, UserCreate, UserUpdate, UserLogin
+from src.pagination import Page, PageParams, paginate, fields_param
 from src.events.schemas import EventResponse
 from src.security import sign_jwt, JWTBearer
+from src.passwords import hash_password, verify_password
+from src.lru import ExpiringLRUCache
+from src.loaders import Loaders, get_loaders, get_primary_loaders
+from src.config import settings as s
+from src.reservations.seats import release_user_seats
+from src.reservations.inventory import return_seats
+from src.events.availability import publish_availability
+from src.comments.ratings import release_user_ratings
+from src.reservations.models import Reservation
+from src.events.models import Event
+from src.comments.models import Comment
+from src.cache import tagged, invalidate, invalidate_events, event_tags, cache
 
 from sqlalchemy import select
+import asyncio
+import time
+
+user_cache = ExpiringLRUCache(s.user_cache_size)
 
 router = APIRouter(
     prefix="/users",
     tags=["Users"]
 )
 
-@router.get("/me")
-async def me(user_id: int = Depends(JWTBearer()), session: AsyncSession = Depends(get_async_session)):
-    query = select(User).where(User.id == user_id)
-    query_result = await session.scalars(query)
-    result = query_result.first()
+@router.get("/me", response_model=UserResponse)
+async def me(user_id: int = Depends(JWTBearer()), loaders: Loaders = Depends(get_loaders)):
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    result = await loaders.by(User.id).load(user_id)
 
     if result is None:
         raise HTTPException(status_code=404, detail="Usuário não encontrado.")
 
+    if s.user_cache_ttl > 0:
+        user_cache.set(user_id, UserResponse.model_validate(result, from_attributes=True), time.time() + s.user_cache_ttl)
     return result
 
 
-@router.get("/", response_model=List[UserResponse])
-async def get_users(session: AsyncSession = Depends(get_async_session)):
+@router.get("/", response_model=Page[UserResponse])
+async def get_users(page: PageParams = Depends(), fields: Optional[List[str]] = Depends(fields_param(UserResponse)), session: AsyncSession = Depends(get_read_session)):
     query = select(User)
-    query_result = await session.scalars(query)
-    result = query_result.unique().all()
-    return result
+    return await paginate(session, query, User, page, fields, UserResponse)
 
 
 @router.post("/login")
-async def login(payload: UserLogin, session: AsyncSession = Depends(get_async_session)):
-    query = select(User).where(User.username == payload.username)
-    query_result = await session.scalars(query)
-    result = query_result.first()
+async def login(payload: UserLogin, loaders: Loaders = Depends(get_loaders)):
+    result = await loaders.by(User.username).load(payload.username) if payload.username is not None else None
 
-    if result is None and result.check_password(payload.password):
+    if result is None or payload.password is None or not await verify_password(payload.password, result.password):
         raise HTTPException(status_code=404, detail="Usuário ou senha estão incorretos.")
 
     return sign_jwt(result.id)
@@ -51,7 +68,7 @@ async def login(payload: UserLogin, session: AsyncSession = Depends(get_async_se
 async def create_user(payload: UserCreate, session: AsyncSession = Depends(get_async_session)):
     new_user = User(
         username=payload.username,
-        password_setter=payload.password,
+        password=await hash_password(payload.password),
         email=payload.email,
         is_admin=payload.is_admin
     )
@@ -65,25 +82,23 @@ async def create_user(payload: UserCreate, session: AsyncSession = Depends(get_a
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, session: AsyncSession = Depends(get_async_session)):
-    query = select(User).where(User.id == user_id)
-    query_result = await session.scalars(query)
-    result = query_result.first()
+@cache(expire=s.cache_ttl, namespace="user", key_builder=tagged("user:{user_id}"))
+async def get_user(user_id: int, loaders: Loaders = Depends(get_primary_loaders)):
+    result = await loaders.by(User.id).load(user_id)
 
     if not result:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
-    return result
+    return UserResponse.model_validate(result, from_attributes=True)
 
 
 @router.get("/{user_id}/events", response_model=Optional[List[EventResponse]])
-async def get_user(user_id: int, session: AsyncSession = Depends(get_async_session)):
-    query = select(User).where(User.id == user_id)
-    query_result = await session.scalars(query)
-    result = query_result.first()
+@cache(expire=s.cache_ttl, namespace="user_events", key_builder=tagged("user:{user_id}:events"))
+async def get_user_events(user_id: int, loaders: Loaders = Depends(get_primary_loaders)):
+    result, events = await asyncio.gather(loaders.by(User.id).load(user_id), loaders.many_by(Event.user_id).load(user_id))
 
     if not result:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
-    return result.events
+    return events
 
 
 @router.patch("/{user_id}", response_model=UserResponse)
@@ -95,14 +110,19 @@ async def update_user(user_id: int, payload: UserUpdate, session: AsyncSession =
     if not result:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
-    for field, value in payload.model_dump().items():
+    for field, value in payload.model_dump(exclude={"password"}).items():
         if value is not None:
             setattr(result, field, value)
 
+    if payload.password is not None:
+        result.password = await hash_password(payload.password)
+
     try:
         await session.commit()
     except IntegrityError:
         raise HTTPException(status_code=400, detail="Usuário já foi cadastrado ")
+    user_cache.pop(user_id)
+    await invalidate(f"user:{user_id}")
     return result
 
 @router.delete("/{user_id}", status_code=204)
@@ -114,6 +134,22 @@ async def delete_user(user_id: int, payload: UserUpdate, session: AsyncSession =
     if not result:
         raise HTTPException(status_code=404, detail="Usuário não foi encontrado")
 
+    query_result = await session.scalars(select(Event.id).where(Event.user_id == user_id))
+    event_ids = query_result.all()
+    tags = [tag for event_id in event_ids for tag in event_tags(event_id, user_id)]
+    query_result = await session.scalars(select(Comment.id).where(Comment.user_id == user_id))
+    tags += [f"comment:{comment_id}" for comment_id in query_result.all()]
+    query_result = await session.scalars(select(Reservation.event_id).where(Reservation.user_id == user_id).distinct())
+    reserved_event_ids = query_result.all()
+
+    released_seats = await release_user_seats(session, user_id)
+    rated_event_ids = await release_user_ratings(session, user_id)
     await session.delete(result)
     await session.commit()
+    user_cache.pop(user_id)
+    await invalidate(f"user:{user_id}", f"user:{user_id}:events", *tags, *(f"event:{event_id}:ratings" for event_id in rated_event_ids))
+    for event_id, num_guests in released_seats.items():
+        await return_seats(event_id, num_guests)
+    await invalidate_events(session, [*event_ids, *reserved_event_ids])
+    await publish_availability(*released_seats)
     return None
\ No newline at end of file
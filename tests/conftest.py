@@ -0,0 +1,36 @@
+import os
+
+# Settings exige essas variáveis; os testes não abrem conexão com o banco.
+for name, value in {
+    "APP_NAME": "EventONE", "DB_HOST": "localhost", "DB_PORT": "5432", "DB_USER": "test", "DB_PASS": "test",
+    "DB_NAME": "test", "SECRET_KEY": "test", "ALGORITHM": "HS256", "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+}.items():
+    os.environ.setdefault(name, value)
+
+import fakeredis
+import pytest
+from redis.commands.core import AsyncScript
+
+import src.main  # noqa: F401 registra todos os modelos
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def fake_redis():
+    return fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+
+@pytest.fixture
+def use_redis(monkeypatch, fake_redis):
+    """Troca o cliente Redis de um módulo, e dos scripts Lua registrados nele, pelo fakeredis."""
+    def use(module):
+        monkeypatch.setattr(module, "redis", fake_redis)
+        for value in vars(module).values():
+            if isinstance(value, AsyncScript):
+                monkeypatch.setattr(value, "registered_client", fake_redis)
+        return fake_redis
+    return use
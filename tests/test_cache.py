@@ -0,0 +1,59 @@
+import pytest
+from fastapi import FastAPI
+from fastapi_cache import FastAPICache
+from httpx import ASGITransport, AsyncClient
+
+from src import cache as cache_module
+from src.cache import CacheCoder, TaggedRedisBackend, cache, invalidate, tagged
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def client(use_redis):
+    redis = use_redis(cache_module)
+    FastAPICache.reset()
+    FastAPICache.init(TaggedRedisBackend(redis), prefix=cache_module.PREFIX, coder=CacheCoder)
+    calls = []
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    @cache(expire=3600, namespace="item", key_builder=tagged("item:{item_id}"))
+    async def get_item(item_id: int):
+        calls.append(item_id)
+        return {"id": item_id, "version": len(calls)}
+
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    client.calls = calls
+    return client
+
+
+async def test_same_etag_on_miss_and_hit(client):
+    miss = await client.get("/items/1")
+    hit = await client.get("/items/1")
+
+    assert client.calls == [1]
+    assert miss.json() == hit.json()
+    assert miss.headers["ETag"] == hit.headers["ETag"]
+    assert miss.headers["Cache-Control"] == hit.headers["Cache-Control"] == "no-cache"
+
+
+async def test_if_none_match_returns_304(client):
+    etag = (await client.get("/items/1")).headers["ETag"]
+
+    response = await client.get("/items/1", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+async def test_invalidation_changes_etag(client):
+    etag = (await client.get("/items/1")).headers["ETag"]
+    await invalidate("item:1")
+
+    response = await client.get("/items/1", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"] != etag
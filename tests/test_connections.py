@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+import pytest
+
+from src import connections
+from src.connections import ConnectionManager, publish, run_subscriber
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.received: asyncio.Queue[str] = asyncio.Queue()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        await self.received.put(text)
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def wait_for_subscribers(redis, channel: str, count: int):
+    while (await redis.pubsub_numsub(channel))[0][1] < count:
+        await asyncio.sleep(0.01)
+
+
+async def test_publish_reaches_every_worker(use_redis):
+    redis = use_redis(connections)
+    # Cada manager faz o papel de um worker, com seu próprio subscriber no mesmo Redis.
+    managers = [ConnectionManager(), ConnectionManager()]
+    sockets = [FakeWebSocket() for _ in managers]
+    subscribers = [asyncio.create_task(run_subscriber(manager)) for manager in managers]
+    try:
+        for manager, websocket in zip(managers, sockets):
+            await manager.connect(websocket)
+        await asyncio.wait_for(wait_for_subscribers(redis, connections.s.ws_broadcast_channel, 2), 5)
+
+        assert await publish({"message": "olá"}) == 2
+
+        for websocket in sockets:
+            assert json.loads(await asyncio.wait_for(websocket.received.get(), 5)) == {"message": "olá"}
+    finally:
+        for task in subscribers:
+            task.cancel()
+        await asyncio.gather(*subscribers, return_exceptions=True)
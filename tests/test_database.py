@@ -0,0 +1,27 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.database import PRIMARY_COOKIE, ReadYourWritesMiddleware
+
+
+def make_client(monkeypatch):
+    monkeypatch.setattr("src.database.s.db_read_your_writes_window", 5)
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.post("/events")
+    def create_event():
+        return {}
+
+    @app.get("/events")
+    def list_events():
+        return []
+
+    return TestClient(app)
+
+
+def test_write_pins_client_to_primary(monkeypatch):
+    client = make_client(monkeypatch)
+
+    assert PRIMARY_COOKIE in client.post("/events").cookies
+    assert PRIMARY_COOKIE not in client.get("/events").cookies
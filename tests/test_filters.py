@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.events.filters import EventFilters
+
+
+app = FastAPI()
+
+
+@app.get("/events/")
+async def get_events(filters: EventFilters = Depends()):
+    return {"date_from": filters.date_from, "date_to": filters.date_to}
+
+
+client = TestClient(app)
+
+
+def test_naive_dates_are_utc():
+    response = client.get("/events/", params={"date_from": "2024-01-01T00:00:00", "date_to": "2024-02-01T00:00:00Z"})
+
+    assert response.status_code == 200
+    assert datetime.fromisoformat(response.json()["date_from"]) == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_date_from_after_date_to():
+    response = client.get("/events/", params={"date_from": "2024-03-01T00:00:00", "date_to": "2024-02-01T00:00:00-03:00"})
+
+    assert response.status_code == 400
@@ -0,0 +1,169 @@
+import json
+
+import pytest
+
+from src.reservations import inventory
+from src.reservations.inventory import SoldOut, available_key, hold_key, pending_key
+
+
+pytestmark = pytest.mark.anyio
+
+
+class Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeDatabase:
+    """Estado mínimo do banco usado por flush_event e reconcile_event."""
+
+    def __init__(self, users=(), available=100):
+        self.users = set(users)
+        self.available = available
+        self.reservations: dict[str, int] = {}
+        self.inserted: list[dict] = []
+        self.commits = 0
+
+    async def execute(self, query):
+        return Rows(list(self.reservations.items()))
+
+    async def scalars(self, query):
+        return Rows([self.available])
+
+    async def commit(self):
+        self.commits += 1
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def redis(use_redis):
+    return use_redis(inventory)
+
+
+@pytest.fixture
+def published(monkeypatch):
+    events = []
+
+    async def publish_availability(*event_ids):
+        events.extend(event_ids)
+
+    monkeypatch.setattr(inventory.availability, "publish_availability", publish_availability)
+    return events
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase(users={1, 2})
+
+    async def existing_ids(session, column, ids):
+        return set(ids) & database.users
+
+    async def reserve_seats(session, event_id, num_guests):
+        if num_guests > database.available:
+            return None
+        database.available -= num_guests
+        return num_guests
+
+    async def insert_many(session, model, rows):
+        ids = []
+        for row in rows:
+            database.inserted.append(row)
+            ids.append(len(database.inserted))
+            database.reservations[row["hold_id"]] = ids[-1]
+        return ids
+
+    async def invalidate_events(session, event_ids):
+        pass
+
+    monkeypatch.setattr(inventory, "async_session_maker", database)
+    monkeypatch.setattr(inventory, "existing_ids", existing_ids)
+    monkeypatch.setattr(inventory, "reserve_seats", reserve_seats)
+    monkeypatch.setattr(inventory, "insert_many", insert_many)
+    monkeypatch.setattr(inventory, "invalidate_events", invalidate_events)
+    return database
+
+
+async def test_hold_seats_decrements_and_queues(redis):
+    await redis.set(available_key(1), 5)
+
+    hold = await inventory.hold_seats(1, user_id=1, num_guests=3)
+
+    assert hold["status"] == "pending"
+    assert int(await redis.get(available_key(1))) == 2
+    assert json.loads(await redis.lindex(pending_key(1), 0))["hold_id"] == hold["hold_id"]
+    assert (await inventory.get_hold(hold["hold_id"]))["status"] == "pending"
+
+
+async def test_hold_seats_sold_out_keeps_counter(redis):
+    await redis.set(available_key(1), 2)
+
+    with pytest.raises(SoldOut):
+        await inventory.hold_seats(1, user_id=1, num_guests=3)
+
+    assert int(await redis.get(available_key(1))) == 2
+    assert await redis.llen(pending_key(1)) == 0
+
+
+async def test_hold_seats_without_flash_sale(redis):
+    assert await inventory.hold_seats(1, user_id=1, num_guests=1) is None
+
+
+async def test_reconcile_skipped_while_holds_are_pending(redis, database):
+    await redis.set(available_key(1), 5)
+    await inventory.hold_seats(1, user_id=1, num_guests=1)
+    database.available = 50
+
+    assert await inventory.reconcile_event(1) is False
+    assert int(await redis.get(available_key(1))) == 4
+
+    await redis.delete(pending_key(1))
+    assert await inventory.reconcile_event(1) is True
+    assert int(await redis.get(available_key(1))) == 50
+
+
+async def test_flush_rejects_unknown_users_and_returns_seats(redis, database, published):
+    await redis.set(available_key(1), 10)
+    valid = await inventory.hold_seats(1, user_id=1, num_guests=2)
+    unknown = await inventory.hold_seats(1, user_id=99, num_guests=3)
+
+    assert await inventory.flush_event(1) == 2
+
+    assert [row["hold_id"] for row in database.inserted] == [valid["hold_id"]]
+    assert (await inventory.get_hold(valid["hold_id"]))["status"] == "confirmed"
+    rejected = await inventory.get_hold(unknown["hold_id"])
+    assert rejected["status"] == "rejected"
+    assert rejected["detail"] == "Usuário não encontrado"
+    assert int(await redis.get(available_key(1))) == 8
+    assert await redis.llen(pending_key(1)) == 0
+    assert published == [1]
+
+
+async def test_flush_after_crash_does_not_duplicate(redis, database):
+    await redis.set(available_key(1), 10)
+    hold = await inventory.hold_seats(1, user_id=1, num_guests=2)
+    # O commit anterior gravou a reserva, mas o processo caiu antes do LTRIM.
+    database.reservations[hold["hold_id"]] = 7
+    database.available = 98
+
+    assert await inventory.flush_event(1) == 1
+
+    assert database.inserted == []
+    assert database.available == 98
+    status = json.loads(await redis.get(hold_key(hold["hold_id"])))
+    assert status["status"] == "confirmed"
+    assert status["reservation_id"] == 7
+    assert await redis.llen(pending_key(1)) == 0
@@ -0,0 +1,83 @@
+import pytest
+
+from src.jobs import queue
+from src.jobs.queue import InvalidJobArgs
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def redis(use_redis, monkeypatch):
+    monkeypatch.setattr(queue.s, "jobs_retry_backoff", 0)
+    return use_redis(queue)
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    calls = []
+
+    async def echo(value: int) -> dict:
+        calls.append(value)
+        return {"value": value}
+
+    monkeypatch.setitem(queue.JOBS, "echo", echo)
+    return calls
+
+
+async def test_enqueue_once_returns_the_same_job(redis, jobs):
+    first = await queue.enqueue_once("echo", {"value": 1})
+
+    assert await queue.enqueue_once("echo", {"value": 1}) == first
+    assert await queue.enqueue_once("echo", {"value": 2}) != first
+    assert await redis.llen(queue.QUEUE_KEY) == 2
+
+
+async def test_enqueue_rejects_bad_arguments(redis, jobs):
+    with pytest.raises(InvalidJobArgs):
+        await queue.enqueue("echo", {"other": 1})
+
+    assert await redis.llen(queue.QUEUE_KEY) == 0
+
+
+async def test_worker_crash_requeues_the_job(redis, jobs, monkeypatch):
+    job_id = await queue.enqueue("echo", {"value": 1})
+    # O worker moveu o job para jobs:processing e caiu antes de terminar.
+    assert (await redis.blmove(queue.QUEUE_KEY, queue.PROCESSING_KEY, 1, "RIGHT", "LEFT")).decode() == job_id
+    await redis.hset(queue.job_key(job_id), "status", "running")
+
+    now = 1000.0
+    monkeypatch.setattr(queue.time, "time", lambda: now)
+    assert await queue.requeue_stale() == 0
+    now += queue.s.jobs_lease_ttl
+    assert await queue.requeue_stale() == 1
+
+    claimed = await redis.blmove(queue.QUEUE_KEY, queue.PROCESSING_KEY, 1, "RIGHT", "LEFT")
+    await queue.run_claimed(claimed.decode())
+
+    assert jobs == [1]
+    assert (await queue.get_job(job_id))["status"] == "done"
+    assert await redis.llen(queue.PROCESSING_KEY) == 0
+
+
+async def test_running_job_keeps_its_lease(redis, jobs):
+    job_id = await queue.enqueue("echo", {"value": 1})
+    await redis.blmove(queue.QUEUE_KEY, queue.PROCESSING_KEY, 1, "RIGHT", "LEFT")
+    await redis.set(queue.lease_key(job_id), 1)
+
+    assert await queue.requeue_stale() == 0
+    assert await queue.requeue_stale() == 0
+    assert await redis.llen(queue.QUEUE_KEY) == 0
+
+
+async def test_failed_job_waits_in_retry_set(redis, jobs):
+    job_id = await queue.enqueue("echo", {"value": 1})
+    queue.JOBS["echo"] = lambda value: 1 / 0
+
+    await redis.blmove(queue.QUEUE_KEY, queue.PROCESSING_KEY, 1, "RIGHT", "LEFT")
+    await queue.run_claimed(job_id)
+
+    assert (await queue.get_job(job_id))["status"] == "queued"
+    assert await redis.zscore(queue.RETRY_KEY, job_id) is not None
+    assert await redis.llen(queue.PROCESSING_KEY) == 0
+    assert await queue.promote_due_retries() == 1
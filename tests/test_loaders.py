@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from src.loaders import Loader
+
+
+pytestmark = pytest.mark.anyio
+
+
+def fetcher(calls: list, gate: asyncio.Event = None):
+    async def fetch(keys):
+        calls.append(list(keys))
+        if gate is not None:
+            await gate.wait()
+        return {key: key * 10 for key in keys}
+    return fetch
+
+
+async def test_batches_keys_of_the_same_tick():
+    calls = []
+    loader = Loader(fetcher(calls))
+
+    assert await asyncio.gather(loader.load(1), loader.load(2), loader.load(1)) == [10, 20, 10]
+    assert await loader.load(2) == 20
+    assert calls == [[1, 2]]
+
+
+async def test_cancelled_load_is_dropped_from_cache():
+    calls, gate = [], asyncio.Event()
+    loader = Loader(fetcher(calls, gate))
+
+    future = loader.load(1)
+    await asyncio.sleep(0)
+    future.cancel()
+    gate.set()
+    await asyncio.gather(*loader.tasks)
+
+    assert 1 not in loader.cache
+    assert await loader.load(1) == 10
+    assert calls == [[1], [1]]
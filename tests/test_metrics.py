@@ -0,0 +1,46 @@
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.metrics import REQUEST_QUERIES, REQUESTS, instrument_app, request_stats
+
+
+def simulated_query():
+    request_stats.get().queries += 1
+
+
+def make_app():
+    app = FastAPI()
+    instrument_app(app)
+
+    @app.get("/export/{event_id}")
+    def export(event_id: int):
+        def rows():
+            for _ in range(3):
+                simulated_query()
+                yield b"{}\n"
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    return app
+
+
+def test_streaming_body_queries_are_counted():
+    client = TestClient(make_app())
+    bucket = REQUEST_QUERIES.buckets.index(3)
+    counts = REQUEST_QUERIES.counts.setdefault(("GET", "/export/{event_id}"), [0] * (len(REQUEST_QUERIES.buckets) + 1))
+    requests, with_three_queries = REQUESTS.values[("GET", "/export/{event_id}", 200)], counts[bucket]
+
+    response = client.get("/export/7")
+
+    assert response.status_code == 200
+    assert REQUESTS.values[("GET", "/export/{event_id}", 200)] == requests + 1
+    assert counts[bucket] == with_three_queries + 1
+
+
+def test_server_timing_header_is_sent(monkeypatch):
+    monkeypatch.setattr("src.metrics.s.server_timing", True)
+    client = TestClient(make_app())
+
+    response = client.get("/export/8")
+
+    assert response.headers["Server-Timing"].startswith("app;dur=")
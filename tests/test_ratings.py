@@ -0,0 +1,16 @@
+import pytest
+
+from src.comments.ratings import rating_delta, rating_of
+
+
+@pytest.mark.parametrize("value, rating", [
+    (5, 5), (5.0, 5), (10, 10), (1.0, 1),
+    (5.5, None), (0, None), (11, None), (True, None), ("5", None), (None, None), (float("nan"), None),
+])
+def test_rating_of(value, rating):
+    assert rating_of({"raiting": value}) == rating
+
+
+def test_rating_delta_ignores_comments_without_rating():
+    assert rating_delta(1, {"raiting": 5.0}, 1) == {(1, 5): 1}
+    assert rating_delta(1, {"raiting": 5.5}, 1) == {}
@@ -0,0 +1,21 @@
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from src.config import settings as s
+from src.security import decode_jwt, sign_jwt
+
+
+def test_decode_signed_token():
+    token = sign_jwt(7)["access_token"]
+
+    assert decode_jwt(token)["user_id"] == 7
+
+
+def test_token_without_exp_is_invalid():
+    token = jwt.encode({"user_id": 7}, s.secret_key.get_secret_value(), algorithm=s.algorithm)
+
+    with pytest.raises(HTTPException) as error:
+        decode_jwt(token)
+
+    assert error.value.status_code == 401